@@ -0,0 +1,96 @@
+# -------------------------------------------------- #
+# Filename:     BatchRollout.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Vectorized random playouts (NumPy).
+# -------------------------------------------------- #
+
+# imports
+try:
+    import numpy as np
+except ImportError: # optional dependency
+    np = None
+import Bitboard
+
+# constants
+available = np is not None
+OUTCOME_NONE = 0
+OUTCOME_WIN  = 1
+OUTCOME_LOSE = 2
+OUTCOME_DRAW = 3
+
+# cache of win-line matrices, keyed by (cells, win masks)
+_lines = {}
+
+# functions
+def _line_matrix(cells, win_masks):
+    """ Returns the (cells x lines) 0/1 matrix of win lines
+        and the length of every line.
+    """
+
+    key = (cells, win_masks)
+    if key not in _lines:
+        lines = np.array(
+            [[(w >> i) & 1 for w in win_masks] for i in range(cells)],
+            dtype=np.int16
+        )
+        _lines[key] = (lines, lines.sum(axis=0))
+    return _lines[key]
+
+def _unpack(mask, cells):
+    """ Returns a bitmask as a 0/1 vector of length 'cells'.
+    """
+
+    return np.array([(mask >> i) & 1 for i in range(cells)], dtype=np.int16)
+
+def rollout(mine, theirs, n, cells=Bitboard.CELLS, win_masks=Bitboard.WIN_MASKS, seed=None):
+    """ Plays 'n' random games at once from the position
+        given by two bitmasks ('mine' belongs to the player
+        to move) and returns the outcome counts as a list
+        indexed by outcome: [-, wins, losses, draws]
+
+        * Stones per win line start as a matrix product of
+          the board against the win-line table, then only the
+          lines through each placed stone are updated. *
+        * Expects at least 1 playable move and NumPy. *
+    """
+
+    rng = np.random.default_rng(seed)
+    lines, lengths = _line_matrix(cells, win_masks)
+
+    # stones per win line (n x lines), one array per side
+    counts = (
+        np.tile(_unpack(mine, cells) @ lines, (n, 1)),
+        np.tile(_unpack(theirs, cells) @ lines, (n, 1))
+    )
+    taken = np.tile(_unpack(mine | theirs, cells) != 0, (n, 1))
+    outcome = np.zeros(n, dtype=np.int8)
+    active = np.arange(n)
+    turn = 0 # 0 : player to move, 1 : opponent
+
+    # simulation loop (every game moves at once)
+    while active.size:
+
+        # pick a random empty cell per game
+        empty = ~taken[active]
+        keys = rng.random(empty.shape)
+        keys[~empty] = -1.0
+        picks = keys.argmax(axis=1)
+        taken[active, picks] = True
+
+        # count the stone on every line through it
+        hit = lines[picks]
+        mover = counts[turn]
+        mover[active] += hit
+
+        # only stop games that end
+        won = ((mover[active] == lengths) & (hit != 0)).any(axis=1)
+        full = empty.sum(axis=1) == 1
+        outcome[active[won]] = OUTCOME_WIN if turn == 0 else OUTCOME_LOSE
+        outcome[active[full & ~won]] = OUTCOME_DRAW
+        active = active[~(won | full)]
+
+        # move to next player
+        turn = 1 - turn
+
+    return np.bincount(outcome, minlength=4).tolist()
@@ -0,0 +1,134 @@
+# -------------------------------------------------- #
+# Filename:     Bitboard.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Bitboard helpers for the 3x3 board.
+# -------------------------------------------------- #
+
+# A board is a single int holding two 9-bit masks:
+#   - bits 0..8  : cells taken by X
+#   - bits 9..17 : cells taken by O
+# Cell [x,y] maps to bit (y * 3 + x) within a mask.
+
+# constants
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1 # every cell of one mask set
+EMPTY_BOARD = 0
+EMPTY_SYMBOL = '_'
+SHIFTS = {'X': 0, 'O': CELLS} # where each symbol's mask lives
+
+# every winning line as a 9-bit mask
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000, # rows
+    0b001001001, 0b010010010, 0b100100100, # columns
+    0b100010001, 0b001010100               # diagonals
+)
+
+# every cell index as an [x,y] move (precomputed)
+MOVES = tuple([i % SIZE, i // SIZE] for i in range(CELLS))
+
+# the 8 board symmetries (rotations & reflections), each as
+# a cell permutation: SYMMETRIES[s][i] is where cell i goes
+SYMMETRIES = tuple(
+    tuple(
+        (lambda x, y: y * SIZE + x)(*f(i % SIZE, i // SIZE))
+        for i in range(CELLS)
+    )
+    for f in (
+        lambda x, y: (x, y),                       # identity
+        lambda x, y: (SIZE - 1 - y, x),            # rotate 90
+        lambda x, y: (SIZE - 1 - x, SIZE - 1 - y), # rotate 180
+        lambda x, y: (y, SIZE - 1 - x),            # rotate 270
+        lambda x, y: (SIZE - 1 - x, y),            # mirror left/right
+        lambda x, y: (x, SIZE - 1 - y),            # mirror up/down
+        lambda x, y: (y, x),                       # main diagonal
+        lambda x, y: (SIZE - 1 - y, SIZE - 1 - x)  # anti diagonal
+    )
+)
+
+# inverse of every symmetry (maps a transformed cell back)
+INVERSES = tuple(
+    tuple(sym.index(i) for i in range(CELLS))
+    for sym in SYMMETRIES
+)
+
+# every 9-bit mask under every symmetry (precomputed)
+_TRANSFORMED = tuple(
+    tuple(
+        sum(1 << sym[i] for i in range(CELLS) if mask >> i & 1)
+        for mask in range(1 << CELLS)
+    )
+    for sym in SYMMETRIES
+)
+
+# macros
+index = lambda pt: pt[1] * SIZE + pt[0]
+mask_of = lambda board, symbol: (board >> SHIFTS[symbol]) & FULL
+taken = lambda board: (board | (board >> CELLS)) & FULL
+
+# functions
+def place(board, pt, symbol):
+    """ Returns a new board with 'symbol' placed
+        at a point [x,y].
+    """
+
+    return board | (1 << (index(pt) + SHIFTS[symbol]))
+
+def clear(board, pt):
+    """ Returns a new board with the point [x,y] emptied.
+    """
+
+    bit = 1 << index(pt)
+    return board & ~(bit | (bit << CELLS))
+
+def symbol_at(board, pt):
+    """ Returns the symbol at a point [x,y],
+        or the empty symbol.
+    """
+
+    bit = 1 << index(pt)
+    if board & bit:
+        return 'X'
+    if board & (bit << CELLS):
+        return 'O'
+    return EMPTY_SYMBOL
+
+def wins(mask):
+    """ True if a 9-bit mask contains a winning line.
+    """
+
+    for w in WIN_MASKS:
+        if mask & w == w:
+            return True
+    return False
+
+def canonical(mine, theirs):
+    """ Returns the smallest key (mine | theirs << 9) over
+        the 8 symmetries of a position, along with the index
+        of the symmetry that produced it.
+    """
+
+    best = None
+    best_sym = 0
+    for s in range(len(SYMMETRIES)):
+        table = _TRANSFORMED[s]
+        key = table[mine] | (table[theirs] << CELLS)
+        if best is None or key < best:
+            best = key
+            best_sym = s
+    return best, best_sym
+
+def transform(mask, s):
+    """ Returns a 9-bit mask under symmetry 's' (an index
+        into SYMMETRIES).
+    """
+
+    return _TRANSFORMED[s][mask]
+
+def empty_moves(board):
+    """ Returns a list of [x,y] moves for every empty cell.
+    """
+
+    free = ~taken(board) & FULL
+    return [MOVES[i] for i in range(CELLS) if free >> i & 1]
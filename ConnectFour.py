@@ -0,0 +1,86 @@
+# -------------------------------------------------- #
+# Filename:     ConnectFour.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Connect Four game class.
+# -------------------------------------------------- #
+
+# imports
+from Game import Game
+from MNKGame import MNKGame
+
+# class
+class ConnectFour(MNKGame):
+    """ Connect Four Game!
+
+        A 7x6 m,n,k game (4 in a row) where stones fall to the
+        lowest empty cell of a column. Row 0 is the top of the
+        board, so a column fills from y = height - 1 upwards.
+
+        * Moves are still positions [x,y] (only the lowest empty
+          cell of each column is legal), so the tree, players
+          and rendering all work unchanged. *
+    """
+
+    def __init__(self, p1, p2, width=7, height=6, seed=None):
+        """ Initializes the game.
+        """
+
+        MNKGame.__init__(self, p1, p2, width, height, 4, seed)
+
+        # stones fall, so only a left/right mirror keeps a position legal
+        self.symmetries = self.symmetries[:2]
+
+    def moves(self, board=None):
+        """ Returns a list of possible moves (the lowest empty
+            cell of every column that is not full).
+
+            * An alternate board may be passed instead as well. *
+        """
+
+        if board is None:
+            board = self.board
+
+        taken = board | (board >> self.cells)
+        moves = []
+        for x in range(self.width):
+            for y in range(self.height - 1, -1, -1):
+                if not taken >> (y * self.width + x) & 1:
+                    moves.append(self.moves_list[y * self.width + x])
+                    break
+        return moves
+
+    def validate(self, state):
+        """ Game protocol: like MNKGame.validate, but every
+            stone must also rest on another one (or on the
+            bottom row).
+        """
+
+        MNKGame.validate(self, state)
+        width = self.width
+        taken = (state | state >> self.cells) & self.full
+        bottom = ((1 << width) - 1) << (self.cells - width)
+        if taken & ~(taken >> width | bottom):
+            raise ValueError('a stone is floating')
+
+    # stones fall, so any empty cell is not a legal move
+    playout = Game.playout
+
+    def _left(self, moves, move):
+        """ Legal moves left once 'move' (one of 'moves') is
+            played: the cell above it takes its place, unless
+            the column is now full.
+        """
+
+        x, y = move
+        if y == 0:
+            return [mv for mv in moves if mv != move]
+        above = self.moves_list[(y - 1) * self.width + x]
+        return [above if mv == move else mv for mv in moves]
+
+    def rollouts(self, player, board, n, rng=None):
+        """ Vectorized rollouts assume any empty cell can be
+            played, so they are not supported here.
+        """
+
+        return None
@@ -0,0 +1,176 @@
+# -------------------------------------------------- #
+# Filename:     Evaluator.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Leaf evaluators (value and policy
+#               functions) for batched mcts.
+# -------------------------------------------------- #
+
+# An evaluator scores a whole batch of leaves at once. For every
+# (state, player to move) it returns a tuple: (value, priors)
+#   - value  : expected score for the player to move, between
+#              LOSE_SCORE and WIN_SCORE
+#   - priors : probability of each move, parallel to the game's
+#              legal_moves(state) (None for no preference)
+
+# imports
+import math
+try:
+    import numpy as np
+except ImportError: # optional dependency
+    np = None
+import Bitboard
+import Solver
+from MonteCarloTree import WIN_SCORE, DRAW_SCORE, LOSE_SCORE
+from TicTacToe import TicTacToe
+
+# constants
+available = np is not None # MLPEvaluator needs NumPy
+OUTCOME_WIN  = 1
+OUTCOME_LOSE = 2
+OUTCOME_DRAW = 3
+SOLVED_SCORES = {1: WIN_SCORE, 0: DRAW_SCORE, -1: LOSE_SCORE}
+
+# class
+class Evaluator:
+    """ Evaluator!
+
+        Base class of every leaf evaluator (see the top of
+        this file for what 'evaluate' returns).
+    """
+
+    def evaluate(self, game, states, players, rng):
+        """ Returns a (value, priors) tuple for every state,
+            where players[i] is the player to move in states[i].
+        """
+
+        raise NotImplementedError
+
+class RolloutEvaluator(Evaluator):
+    """ Rollout Evaluator!
+
+        Values are the average score of 'n' random playouts
+        (vectorized when the game supports it); no priors.
+    """
+
+    def __init__(self, n=8):
+        """ Initializes the evaluator.
+        """
+
+        self.n = n
+
+    def evaluate(self, game, states, players, rng):
+        """ Returns a (value, None) tuple for every state.
+        """
+
+        results = []
+        for state, player in zip(states, players):
+            counts = game.rollouts(player, state, self.n, rng)
+            if counts is None:
+                counts = [0, 0, 0, 0]
+                for _ in range(self.n):
+                    counts[game.playout(state, player, rng)] += 1
+            score = WIN_SCORE * counts[OUTCOME_WIN] + LOSE_SCORE * counts[OUTCOME_LOSE] + DRAW_SCORE * counts[OUTCOME_DRAW]
+            results.append((score / self.n, None))
+        return results
+
+class TableEvaluator(Evaluator):
+    """ Table Evaluator!
+
+        Exact values from the TicTacToe solver's table of
+        solved positions; the priors are spread evenly over
+        the perfect moves.
+
+        * Only for plain (3x3) TicTacToe games. *
+    """
+
+    def evaluate(self, game, states, players, rng):
+        """ Returns a (value, priors) tuple for every state.
+        """
+
+        if type(game) is not TicTacToe:
+            raise ValueError('TableEvaluator only knows TicTacToe.')
+
+        results = []
+        for state, player in zip(states, players):
+            best, value = Solver.best_cells(*game.masks(state, player))
+            share = 1 / len(best)
+            priors = [share if Bitboard.index(mv) in best else 0.0 for mv in game.legal_moves(state)]
+            results.append((SOLVED_SCORES[value], priors))
+        return results
+
+class MLPEvaluator(Evaluator):
+    """ MLP Evaluator!
+
+        A small NumPy network (one hidden tanh layer) with a
+        value head and a policy head over the board's cells.
+        Each cell is fed in as 3 inputs: taken by the player
+        to move, taken by the opponent, empty.
+
+        * 'weights' is a dict of arrays, or the path of one
+          saved with 'save'; without it the weights are random
+          (seeded by 'seed'), which is only good for testing. *
+        * The whole batch goes through the network at once. *
+    """
+
+    def __init__(self, cells=Bitboard.CELLS, hidden=32, weights=None, seed=None):
+        """ Initializes the network.
+        """
+
+        if np is None:
+            raise ImportError('MLPEvaluator needs NumPy.')
+
+        if isinstance(weights, str):
+            with np.load(weights) as f:
+                weights = dict(f)
+        if weights is None:
+            rng = np.random.default_rng(seed)
+            scale = 1 / math.sqrt(3 * cells)
+            weights = {
+                'w1': rng.normal(0, scale, (3 * cells, hidden)),
+                'b1': np.zeros(hidden),
+                'wv': rng.normal(0, 1 / math.sqrt(hidden), hidden),
+                'bv': np.zeros(()),
+                'wp': rng.normal(0, 1 / math.sqrt(hidden), (hidden, cells)),
+                'bp': np.zeros(cells)
+            }
+
+        self.cells = cells
+        self.w = weights
+
+    def save(self, path):
+        """ Writes the weights to a .npz file.
+        """
+
+        np.savez(path, **self.w)
+
+    def _features(self, game, states, players):
+        """ Returns the network input for a batch of states.
+        """
+
+        shifts = np.arange(self.cells, dtype=object)
+        x = np.empty((len(states), 3, self.cells))
+        for row, (state, player) in enumerate(zip(states, players)):
+            mine, theirs = game.masks(state, player)
+            x[row, 0] = (mine >> shifts) & 1
+            x[row, 1] = (theirs >> shifts) & 1
+        x[:, 2] = 1 - x[:, 0] - x[:, 1]
+        return x.reshape(len(states), -1)
+
+    def evaluate(self, game, states, players, rng):
+        """ Returns a (value, priors) tuple for every state.
+        """
+
+        w = self.w
+        hidden = np.tanh(self._features(game, states, players) @ w['w1'] + w['b1'])
+        values = 1 / (1 + np.exp(-(hidden @ w['wv'] + w['bv'])))
+        logits = hidden @ w['wp'] + w['bp']
+
+        results = []
+        for row, state in enumerate(states):
+            cells = [mv[1] * game.width + mv[0] for mv in game.legal_moves(state)]
+            legal = logits[row, cells]
+            odds = np.exp(legal - legal.max())
+            priors = (odds / odds.sum()).tolist()
+            results.append((LOSE_SCORE + (WIN_SCORE - LOSE_SCORE) * float(values[row]), priors))
+        return results
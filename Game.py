@@ -0,0 +1,185 @@
+# -------------------------------------------------- #
+# Filename:     Game.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Game-state protocol searched by
+#               MonteCarloTree.
+# -------------------------------------------------- #
+
+# imports
+import copy
+
+# outcomes (for a given player)
+OUTCOME_NONE = 0
+OUTCOME_WIN  = 1
+OUTCOME_LOSE = 2
+OUTCOME_DRAW = 3
+
+# class
+class Game:
+    """ Game Protocol!
+
+        MonteCarloTree only talks to a game through these
+        methods, so any two-player game implementing them can
+        be searched:
+        - legal_moves(state)     : list of moves
+        - apply(state, move)     : new state after the player to move plays 'move'
+        - is_terminal(state)     : True if the game is over
+        - result(state, player)  : outcome (see OUTCOME_*) for 'player'
+        - hash(state)            : hashable key for the state
+        - to_move(state)         : player whose turn it is
+        - playout(state, player, rng, played) : outcome of one random game
+        - step(state, move, moves) : new state, its outcome and its legal moves
+        - fork()                 : copy safe to search from another thread
+        - canonical(state)       : key shared by every symmetric copy of a state
+        - move_classes(state)    : legal moves grouped by symmetric outcome
+
+        stores the following:
+        - board : the current state
+        - players, each with 'opponent' and 'play_index'
+
+        * states must be immutable values (never edited
+          in place) *
+        * 'playout', 'step', 'rollouts', 'describe', 'fork' and
+          'canonical' are optional fast paths / helpers and may
+          be left as they are (by default no two states are
+          symmetric) *
+    """
+
+    def legal_moves(self, state):
+        """ Returns a list of possible moves.
+        """
+
+        raise NotImplementedError
+
+    def apply(self, state, move):
+        """ Returns the state after the player to move plays 'move'.
+        """
+
+        raise NotImplementedError
+
+    def is_terminal(self, state):
+        """ Returns True if the game is over.
+        """
+
+        return self.result(state, self.to_move(state)) != OUTCOME_NONE
+
+    def result(self, state, player):
+        """ Returns the outcome of 'state' for 'player'.
+        """
+
+        raise NotImplementedError
+
+    def hash(self, state):
+        """ Returns a hashable key identifying 'state'.
+        """
+
+        return state
+
+    def to_move(self, state):
+        """ Returns the player whose turn it is.
+        """
+
+        raise NotImplementedError
+
+    def playout(self, state, player, rng, played=None):
+        """ Plays one random game from 'state' (with 'player'
+            to move) using random stream 'rng' and returns the
+            outcome for 'player'.
+
+            * Expects 'state' to have at least 1 playable move. *
+            * If 'played' is a list, every move made is appended
+              to it as a tuple (players take turns, 'player'
+              first), e.g. for RAVE. *
+            * Games override this with an allocation-free
+              version when they can. *
+        """
+
+        while True:
+
+            # simulate
+            move = rng.choice(self.legal_moves(state))
+            state = self.apply(state, move)
+            if played is not None:
+                played.append(tuple(move))
+
+            # only stop if game ends
+            result = self.result(state, player)
+            if result != OUTCOME_NONE:
+                return result
+
+    def step(self, state, move, moves):
+        """ Returns a tuple: (new state, outcome for the player
+            to move there, legal moves there) after the player
+            to move plays 'move' in 'state', whose legal moves
+            are 'moves'. The legal moves are empty when the
+            game is over.
+
+            * Games override this to work the new state out
+              from the move, instead of scanning the board. *
+        """
+
+        state = self.apply(state, move)
+        result = self.result(state, self.to_move(state))
+        return state, result, [] if result != OUTCOME_NONE else self.legal_moves(state)
+
+    def rollouts(self, player, state, n, rng=None):
+        """ Optional: plays 'n' random games at once from
+            'state' with 'player' to move and returns the
+            outcome counts: [-, wins, losses, draws]
+
+            * Returns None when not supported. *
+        """
+
+        return None
+
+    def canonical(self, state):
+        """ Optional: returns a hashable key that is the same
+            for every state equal to 'state' up to a symmetry
+            of the board.
+        """
+
+        return self.hash(state)
+
+    def move_classes(self, state):
+        """ Returns the legal moves grouped into lists of moves
+            that lead to the same position up to a symmetry
+            (by 'canonical'), in legal_moves order.
+        """
+
+        classes = {}
+        for mv in self.legal_moves(state):
+            classes.setdefault(self.canonical(self.apply(state, mv)), []).append(mv)
+        return list(classes.values())
+
+    def symmetry(self, state, other):
+        """ Optional: returns a function mapping a move on
+            'state' to the same move on 'other', a copy of it
+            under a board symmetry (see 'canonical'), or None
+            if no symmetry maps one onto the other.
+        """
+
+        return (lambda mv: mv) if self.hash(state) == self.hash(other) else None
+
+    def validate(self, state):
+        """ Optional: raises a ValueError if 'state' is not a
+            board of this game (used to check boards sent in
+            from outside, see MoveService).
+        """
+
+        pass
+
+    def fork(self):
+        """ Optional: returns a copy of the game that another
+            thread can search with (sharing nothing mutable
+            that searching touches).
+        """
+
+        return copy.copy(self)
+
+    def describe(self, state):
+        """ Optional: returns 'state' as a list of text rows
+            (used when printing trees).
+        """
+
+        return [str(state)]
@@ -23,11 +23,13 @@ class HumanPlayer:
         self.symbol = '?'
         self.opponent = None
 
-    def choose_symbol(self):
+    def choose_symbol(self, quiet=False):
         """ (Invoked if winner of initialcoin flip)
         
             Human selects a symbol for self.
             (Also set opponent's to the opposite symbol)
+
+            * 'quiet' is ignored: a human always needs the prompt. *
         """
 
         print("Player " + str(self.play_index) + " wins the coin flip!")
@@ -50,6 +52,9 @@ class HumanPlayer:
         """ Human selects x and y coordinates of next move.
         """
 
+        if game.width != 3 or game.height != 3:
+            return self._go_coords(game)
+
         move = None
         while True:
 
@@ -110,4 +115,30 @@ class HumanPlayer:
 
         return move
 
+    def _go_coords(self, game):
+        """ Human types the x and y coordinates of next move.
+            (used for boards other than 3x3)
+        """
+
+        while True:
+
+            print("Pick a position as: x y  (0 to " + str(game.width - 1) + ", 0 to " + str(game.height - 1) + ")")
+            choice = input("")
+
+            if choice == "quit":
+                return None
+
+            parts = choice.replace(',', ' ').split()
+            if len(parts) != 2 or not parts[0].isdigit() or not parts[1].isdigit():
+                print("Invalid choice. Try again...")
+                continue
+
+            move = [int(parts[0]), int(parts[1])]
+            if move not in game.legal_moves(game.board):
+                print("Invalid choice. Try again...")
+                continue
+
+            game.set_at(move, self.symbol)
+            return move
+
         
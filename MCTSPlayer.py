@@ -7,12 +7,47 @@
 # -------------------------------------------------- #
 
 # imports
-import random
 import math
+from concurrent.futures import ProcessPoolExecutor
 from MonteCarloTree import MonteCarloTree
+from TranspositionTable import TranspositionTable
+from Seeding import make_rng, derive
+from TicTacToe import TicTacToe
+import Bitboard
+import Solver
 
 # constants
 SQRT2 = math.sqrt(2)
+MERGE_VISITS = 'visits' # sum every worker's root statistics, pick most visited move
+MERGE_VOTE   = 'vote'   # each worker votes for its own best move, majority wins
+WARM_DEPTH   = 64       # moves searched down a warm-start tree to find the board
+
+# functions
+def _search_worker(game, time_limit, uct_c, iterations, seed, table=None, rollouts=1, threads=1, evaluator=None, batch=1,
+                   symmetric=False, rave=None, compact=False):
+    """ Runs one independent mcts search inside a worker
+        process and returns its root statistics along with
+        the worker's own best move.
+    """
+
+    tree = MonteCarloTree.search(
+        game = game,
+        time_limit = time_limit,
+        uct_const = uct_c,
+        iterations = iterations,
+        verbose = False,
+        table = table,
+        rollouts = rollouts,
+        compact = compact,
+        seed = seed,
+        threads = threads,
+        evaluator = evaluator,
+        batch = batch,
+        symmetric = symmetric,
+        rave = rave
+    )
+
+    return tree.root_stats(), tree.best_move(False)
 
 # class
 class MCTSPlayer:
@@ -23,9 +58,63 @@ class MCTSPlayer:
         - selects initial symbols if invoked
         
         * mcts process limited to 1 second by default *
+        * set 'iterations' to also (or, with time_limit=None,
+          only) limit mcts by a fixed number of iterations *
+        * set 'workers' above 1 to search root-parallel: each
+          worker process builds its own tree with the full
+          budget, then the trees are merged via 'merge' *
+        * set 'threads' above 1 to search tree-parallel: that
+          many threads share one tree (per worker), kept apart
+          by virtual losses. On regular (GIL) builds of Python
+          plain playouts can't overlap, so this is no faster
+          than one thread; it only helps with NumPy 'rollouts'
+          (a little) or free-threaded Python. Use 'workers' to
+          use more cores *
+        * with 'reuse_tree' the tree is kept between turns and
+          re-rooted at the current board (single worker only) *
+        * with 'transpositions' positions reached by different
+          move orders share statistics ('table_size' bounds the
+          number of shared positions, and so the tree: cold
+          nodes past it are cut out, see TranspositionTable;
+          None for unbounded) *
+        * 'rollouts' is the number of random playouts per
+          simulated leaf (vectorized with NumPy if installed) *
+        * with 'compact' nodes are stored in parallel arrays,
+          using far less memory per node *
+        * 'seed' (int or random.Random) makes the player's
+          choices reproducible; workers get streams derived
+          from it *
+        * 'evaluator' (see Evaluator) scores leaves in place of
+          random playouts, 'batch' leaves at a time; children
+          are then picked by PUCT using its priors *
+        * 'warm_start' (the path of a tree saved with
+          MonteCarloTree.save) is memory-mapped and searched on
+          from the current board, whenever there is no tree
+          from the previous turn *
+        * with 'symmetric' moves that lead to the same position
+          up to a rotation / reflection share a single child *
+        * 'rave' (an equivalence parameter, e.g. 300) blends
+          all-moves-as-first statistics into the choice of
+          children (see MonteCarloTree.search) *
+        * 'verbose' prints "Thinking..." while searching *
+        * with 'trace' (or a 'hook', see SearchStats) each
+          search's SearchStats are kept as 'search_stats'
+          (single worker only) *
+        * 'book' (a Solver.Book or a path to a saved one) is
+          consulted before searching; mcts only runs for
+          positions or games the book doesn't cover *
+        * 'cache' (a PositionCache, which may be shared by
+          several players) keeps every search's result: a
+          position it is confident about is answered from it,
+          any other position it knows warm-starts the search
+          (single worker only) *
     """
 
-    def __init__(self, time_limit=1000, explore_importance=SQRT2):
+    def __init__(self, time_limit=1000, explore_importance=SQRT2, iterations=None,
+                 workers=1, merge=MERGE_VISITS, reuse_tree=True, threads=1,
+                 transpositions=False, table_size=None, rollouts=1, compact=False, seed=None,
+                 verbose=True, book=None, evaluator=None, batch=1, symmetric=False, warm_start=None,
+                 trace=False, hook=None, cache=None, rave=None):
         """ Initializes the ai.
         """
 
@@ -34,38 +123,211 @@ class MCTSPlayer:
         self.opponent = None
         self.time_limit = time_limit
         self.uct_c = explore_importance
+        self.iterations = iterations
+        self.workers = workers
+        self.merge = merge
+        self.reuse_tree = reuse_tree
+        self.threads = threads
+        self.transpositions = transpositions
+        self.table_size = table_size
+        self.rollouts = rollouts
+        self.compact = compact
+        self.rng = make_rng(seed)
+        self.verbose = verbose
+        self.book = Solver.load_book(book) if isinstance(book, str) else book
+        self.evaluator = evaluator
+        self.batch = batch
+        self.symmetric = symmetric
+        self.warm_start = warm_start
+        self.trace = trace
+        self.hook = hook
+        self.cache = cache
+        self.rave = rave
+        self.tree = None # tree from the previous turn (if reused)
+        self.last_stats = None # root statistics of the last search: move (tuple) -> (wins, sims)
+        self.search_stats = None # SearchStats of the last search (if traced)
+        self._pool = None # worker processes (created on first use)
 
-    def choose_symbol(self):
+    def __getstate__(self):
+        """ Pickles everything except the worker pool, the
+            position cache and the reused tree.
+        """
+
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['cache'] = None # workers search, they don't need the cache
+        state['tree'] = None # nor the tree (the game sent to them carries both players)
+        return state
+
+    def close(self):
+        """ Shuts down the worker processes, if any.
+        """
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def choose_symbol(self, quiet=False):
         """ (Invoked if winner of initialcoin flip)
         
             Randomly select a symbol for self.
             (Also set opponent's to the opposite symbol)
         """
 
-        print("Player " + str(self.play_index) + " wins the coin flip!")
-        print("Player " + str(self.play_index) + ", choose a symbol: X, O")
+        if not quiet:
+            print("Player " + str(self.play_index) + " wins the coin flip!")
+            print("Player " + str(self.play_index) + ", choose a symbol: X, O")
 
-        self.symbol = random.choice(['X', 'O'])
+        self.symbol = self.rng.choice(['X', 'O'])
         if self.symbol == 'X':
             self.opponent.symbol = 'O'
         elif self.symbol == 'O':
             self.opponent.symbol = 'X'
 
-        print("Player " + str(self.play_index) + " chooses " + self.symbol + "!")
-        print("Player " + str(self.opponent.play_index) + "'s symbol is " + self.opponent.symbol + ".")
+        if not quiet:
+            print("Player " + str(self.play_index) + " chooses " + self.symbol + "!")
+            print("Player " + str(self.opponent.play_index) + "'s symbol is " + self.opponent.symbol + ".")
 
     def go(self, game, debug=False, detail=False):
         """ Uses mcts to pick the next best move.
         """
 
+        # answer straight from the book, if it covers the position
+        if self.book is not None and type(game) is TicTacToe:
+            move = self.book.lookup(
+                Bitboard.mask_of(game.board, self.symbol),
+                Bitboard.mask_of(game.board, self.opponent.symbol)
+            )
+            if move is not None:
+                if debug:
+                    print("Book move: " + str(move))
+                self.last_stats = None
+                return move
+
+        # answer from the position cache, if it is confident about the position
+        warm = None
+        if self.cache is not None:
+            cached = self.cache.get(game, game.board)
+            if cached is not None:
+                stats, move, confident = cached
+                if confident:
+                    if debug:
+                        print("Cached move: " + str(move))
+                    self.last_stats = stats
+                    return list(move)
+                warm = stats
+
+        if self.workers > 1:
+            return self._remember(game, self._go_parallel(game, debug))
+
+        # continue from the previous turn's tree, if it still applies
+        tree = None
+        if self.reuse_tree and self.tree is not None:
+            if self.tree.reroot(game.board):
+                tree = self.tree
+                tree.dtl = detail
+
+        # otherwise, from what the cache knows about the position
+        if tree is None and warm is not None:
+            tree = MonteCarloTree.prime(
+                game, warm, detail,
+                table = TranspositionTable(self.table_size) if self.transpositions else None,
+                compact = self.compact,
+                symmetric = self.symmetric
+            )
+
+        # otherwise, from a tree searched offline
+        if tree is None and self.warm_start is not None:
+            loaded = MonteCarloTree.load(self.warm_start, game, mapped=True)
+            if loaded.reroot(game.board, WARM_DEPTH):
+                tree = loaded
+                tree.dtl = detail
+
         tree = MonteCarloTree.search(
             game = game,
             time_limit = self.time_limit,
             uct_const = self.uct_c,
             dbg = debug,
-            dtl = detail
+            dtl = detail,
+            iterations = self.iterations,
+            tree = tree,
+            table = TranspositionTable(self.table_size) if self.transpositions else None,
+            rollouts = self.rollouts,
+            compact = self.compact,
+            seed = self.rng,
+            verbose = self.verbose,
+            threads = self.threads,
+            evaluator = self.evaluator,
+            batch = self.batch,
+            symmetric = self.symmetric,
+            stats = self.trace,
+            hook = self.hook,
+            rave = self.rave
         )
 
-        return tree.best_move(debug)
+        if self.reuse_tree:
+            self.tree = tree
+        self.last_stats = tree.root_stats()
+        self.search_stats = tree.stats
 
-        
+        return self._remember(game, tree.best_move(debug))
+
+    def _remember(self, game, move):
+        """ Stores the last search's result in the position
+            cache (if any) and returns 'move'.
+        """
+
+        if self.cache is not None and move is not None and self.last_stats:
+            self.cache.put(game, game.board, self.last_stats, tuple(move))
+        return move
+
+    def _go_parallel(self, game, debug=False):
+        """ Root-parallel mcts: runs one independent search
+            per worker (each with its own seed), then merges
+            the root statistics to pick the next best move.
+        """
+
+        if self.merge not in (MERGE_VISITS, MERGE_VOTE):
+            raise ValueError('Unknown merge policy: ' + str(self.merge))
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        # search in parallel
+        futures = [
+            self._pool.submit(_search_worker, game, self.time_limit, self.uct_c, self.iterations, seed,
+                              TranspositionTable(self.table_size) if self.transpositions else None,
+                              self.rollouts, self.threads, self.evaluator, self.batch, self.symmetric, self.rave,
+                              self.compact)
+            for seed in derive(self.rng, self.workers)
+        ]
+        results = [f.result() for f in futures]
+
+        # merge root statistics
+        merged = {}
+        votes = {}
+        for stats, best in results:
+            for mv, (wins, sims) in stats.items():
+                w, s = merged.get(mv, (0, 0))
+                merged[mv] = (w + wins, s + sims)
+            if best is not None:
+                votes[tuple(best)] = votes.get(tuple(best), 0) + 1
+
+        self.last_stats = merged
+        if not merged:
+            return None
+
+        # pick move (ties broken by total visits)
+        if self.merge == MERGE_VOTE:
+            key = lambda mv: (votes.get(mv, 0), merged[mv][1])
+        else:
+            key = lambda mv: (merged[mv][1], merged[mv][0])
+        best_move = max(merged, key=key)
+
+        if debug:
+            print("Merged move selection (" + str(self.workers) + " workers):")
+            for mv, (wins, sims) in merged.items():
+                print("Score = " + str(wins) + "/" + str(sims) + " votes = " + str(votes.get(mv, 0)) + " for move: " + str(list(mv)))
+            print("Best move: " + str(list(best_move)))
+
+        return list(best_move)
@@ -0,0 +1,354 @@
+# -------------------------------------------------- #
+# Filename:     MNKGame.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Generalized m,n,k game class (k in a
+#               row on a width x height board).
+# -------------------------------------------------- #
+
+# A board is a single (arbitrarily large) int:
+#   - bits [0, N)   : cells taken by X
+#   - bits [N, 2N)  : cells taken by O
+#   - bits [2N, ..) : index + 1 of the last placed stone (0 if none)
+# where N = width * height and cell [x,y] maps to bit (y * width + x).
+
+# imports
+import BatchRollout
+from TicTacToe import TicTacToe
+
+# cache of win windows, keyed by (width, height, k)
+_windows = {}
+# cache of board symmetries, keyed by (width, height)
+_symmetries = {}
+
+# functions
+def windows(width, height, k):
+    """ Returns every k-in-a-row line as a cell mask, along
+        with the lines through each cell (per cell index).
+    """
+
+    key = (width, height, k)
+    if key in _windows:
+        return _windows[key]
+
+    lines = []
+    for y in range(height):
+        for x in range(width):
+            for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                ex = x + dx * (k - 1)
+                ey = y + dy * (k - 1)
+                if 0 <= ex < width and 0 <= ey < height:
+                    lines.append(sum(1 << ((y + dy * j) * width + (x + dx * j)) for j in range(k)))
+
+    through = [[] for _ in range(width * height)]
+    for line in lines:
+        for i in range(width * height):
+            if line >> i & 1:
+                through[i].append(line)
+
+    _windows[key] = (tuple(lines), [tuple(t) for t in through])
+    return _windows[key]
+
+def symmetries(width, height):
+    """ Returns every rotation / reflection that maps a
+        width x height board onto itself, each as a cell
+        permutation: perm[i] is where cell i goes.
+        (8 for square boards, 4 otherwise)
+    """
+
+    key = (width, height)
+    if key in _symmetries:
+        return _symmetries[key]
+
+    w = width - 1
+    h = height - 1
+    transforms = [
+        lambda x, y: (x, y),         # identity
+        lambda x, y: (w - x, y),     # mirror left/right
+        lambda x, y: (x, h - y),     # mirror up/down
+        lambda x, y: (w - x, h - y)  # rotate 180
+    ]
+    if width == height:
+        transforms += [
+            lambda x, y: (h - y, x), # rotate 90
+            lambda x, y: (y, w - x), # rotate 270
+            lambda x, y: (y, x),     # main diagonal
+            lambda x, y: (h - y, w - x) # anti diagonal
+        ]
+
+    perms = []
+    for f in transforms:
+        perm = []
+        for i in range(width * height):
+            x, y = f(i % width, i // width)
+            perm.append(y * width + x)
+        perms.append(tuple(perm))
+
+    _symmetries[key] = tuple(perms)
+    return _symmetries[key]
+
+# class
+class MNKGame(TicTacToe):
+    """ m,n,k Game!
+
+        Same as TicTacToe (turns, players, game loop), but on
+        a width x height board where k in a row wins.
+        e.g. MNKGame(p1, p2, 15, 15, 5) is gomoku.
+
+        * checking for a win only scans the lines through the
+          last placed stone, so every board must come from
+          set_at (which records that stone) *
+    """
+
+    def __init__(self, p1, p2, width=7, height=7, k=4, seed=None):
+        """ Initializes the game.
+        """
+
+        TicTacToe.__init__(self, p1, p2, seed)
+        self.width = width
+        self.height = height
+        self.k = k
+        self.cells = width * height
+        self.full = (1 << self.cells) - 1
+        self.lines, self.through = windows(width, height, k)
+        self.moves_list = tuple([i % width, i // width] for i in range(self.cells))
+        self.symmetries = symmetries(width, height)
+        self._free = [0] * self.cells
+
+    def _shift(self, symbol):
+        """ Returns where a symbol's mask lives on the board.
+        """
+
+        return 0 if symbol == 'X' else self.cells
+
+    def at(self, pt, board=None):
+        """ Returns the value on the board at
+            a point [x,y].
+
+            * An alternate board may be passed instead as well. *
+        """
+
+        if board is None:
+            board = self.board
+
+        bit = 1 << (pt[1] * self.width + pt[0])
+        if board & bit:
+            return 'X'
+        if board & (bit << self.cells):
+            return 'O'
+        return '_'
+
+    def set_at(self, pt, val, board=None):
+        """ Sets the value on the board at
+            a point [x,y] and returns the new board.
+            (also records it as the last placed stone)
+
+            * An alternate board may be passed instead as well.
+              Only the game's own board is updated in place. *
+        """
+
+        own = board is None
+        if own:
+            board = self.board
+
+        i = pt[1] * self.width + pt[0]
+        stones = board & ((1 << (2 * self.cells)) - 1)
+        stones &= ~((1 << i) | (1 << (i + self.cells)))
+        board = stones
+        if val != '_':
+            board = stones | (1 << (i + self._shift(val))) | ((i + 1) << (2 * self.cells))
+
+        if own:
+            self.board = board
+
+        return board
+
+    def check(self, player, board=None):
+        """ Checks game board for game state change:
+            - 0 : nothing
+            - 1 : current player wins
+            - 2 : current player loses
+            - 3 : draw
+
+            * Only the lines through the last placed stone are
+              scanned (a win can only have just happened). *
+            * An alternate board may be passed instead as well. *
+        """
+
+        if board is None:
+            board = self.board
+
+        last = board >> (2 * self.cells)
+        if last == 0:
+            return 0
+        i = last - 1
+
+        # whose stone was placed last
+        symbol = 'X' if board >> i & 1 else 'O'
+        mask = (board >> self._shift(symbol)) & self.full
+
+        # check wins (lines through the last stone only)
+        for line in self.through[i]:
+            if mask & line == line:
+                return 1 if symbol == player.symbol else 2
+
+        # check for draw
+        if (board | (board >> self.cells)) & self.full == self.full:
+            return 3
+
+        # no game state change required
+        return 0
+
+    def moves(self, board=None):
+        """ Returns a list of possible moves (positions).
+
+            * An alternate board may be passed instead as well. *
+        """
+
+        if board is None:
+            board = self.board
+
+        free = ~(board | (board >> self.cells)) & self.full
+        moves = []
+        while free:
+            low = free & -free
+            moves.append(self.moves_list[low.bit_length() - 1])
+            free ^= low
+        return moves
+
+    def hash(self, state):
+        """ Game protocol: returns the stones without the last
+            move, so move orders reaching the same stones share
+            a key (see TranspositionTable).
+        """
+
+        return state & ((1 << (2 * self.cells)) - 1)
+
+    def canonical(self, state):
+        """ Game protocol: returns the stones (without the last
+            move) under their smallest board symmetry.
+        """
+
+        cells = self.cells
+        x_mask = state & self.full
+        o_mask = (state >> cells) & self.full
+
+        best = None
+        for perm in self.symmetries:
+            key = 0
+            for mask, shift in ((x_mask, 0), (o_mask, cells)):
+                while mask:
+                    low = mask & -mask
+                    key |= 1 << (perm[low.bit_length() - 1] + shift)
+                    mask ^= low
+            if best is None or key < best:
+                best = key
+        return best
+
+    def symmetry(self, state, other):
+        """ Game protocol: returns a function mapping moves on
+            'state' through the board symmetry that turns its
+            stones into those of 'other', or None.
+        """
+
+        cells = self.cells
+        width = self.width
+        target = other & ((1 << (2 * cells)) - 1)
+        for perm in self.symmetries:
+            key = 0
+            mask = state & ((1 << (2 * cells)) - 1)
+            while mask:
+                low = mask & -mask
+                i = low.bit_length() - 1
+                key |= 1 << (perm[i - cells] + cells if i >= cells else perm[i])
+                mask ^= low
+            if key == target:
+                return lambda mv: self.moves_list[perm[mv[1] * width + mv[0]]]
+        return None
+
+    def validate(self, state):
+        """ Game protocol: raises a ValueError if 'state' has
+            stones off the board, two stones on one cell, or a
+            last move that is not one of its stones.
+        """
+
+        if state < 0:
+            raise ValueError('stones off the board')
+        cells = self.cells
+        stones = state & ((1 << (2 * cells)) - 1)
+        TicTacToe.validate(self, stones)
+        last = state >> (2 * cells)
+        if last and (last > cells or not ((stones | stones >> cells) >> (last - 1)) & 1):
+            raise ValueError('the last move is not one of the stones')
+
+    def _stones(self, state):
+        """ Number of stones on a board (ignoring the last move).
+        """
+
+        return bin(state & ((1 << (2 * self.cells)) - 1)).count('1')
+
+    def _fill_free(self, state):
+        """ Writes the empty cell indexes of 'state' into the
+            playout scratch array and returns how many there are.
+        """
+
+        free = self._free
+        taken = (state | state >> self.cells) & self.full
+        n = 0
+        for i in range(self.cells):
+            if not taken >> i & 1:
+                free[n] = i
+                n += 1
+        return n
+
+    def masks(self, state, player):
+        """ Returns the cells of 'player' and of its opponent.
+        """
+
+        return (
+            (state >> self._shift(player.symbol)) & self.full,
+            (state >> self._shift(player.opponent.symbol)) & self.full
+        )
+
+    def _wins_at(self, mask, cell):
+        """ True if 'mask' has a win through 'cell'.
+        """
+
+        for line in self.through[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def rollouts(self, player, board, n, rng=None):
+        """ Plays 'n' random games at once from 'board' with
+            'player' to move. Returns the outcome counts for
+            'player' as a list: [-, wins, losses, draws]
+
+            * Returns None if NumPy is not available. *
+        """
+
+        if not BatchRollout.available:
+            return None
+
+        if rng is None:
+            rng = self.rng
+
+        return BatchRollout.rollout(
+            (board >> self._shift(player.symbol)) & self.full,
+            (board >> self._shift(player.opponent.symbol)) & self.full,
+            n,
+            cells = self.cells,
+            win_masks = self.lines,
+            seed = rng.getrandbits(64)
+        )
+
+    def render(self):
+        """ Prints the board using text.
+        """
+
+        rule = '\t' + '+'.join(['---'] * self.width) + '\n'
+        rows = []
+        for y in range(self.height):
+            rows.append('\t' + '|'.join(' {} '.format(self.at([x, y])) for x in range(self.width)) + '\n')
+
+        print('\n' + rule.join(rows))
@@ -0,0 +1,69 @@
+# -------------------------------------------------- #
+# Filename:     MinimaxPlayer.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Perfect-play (minimax) TicTacToe
+#               AI-player class, used as a benchmark
+#               opponent.
+# -------------------------------------------------- #
+
+# imports
+import Bitboard
+import Solver
+from Seeding import make_rng
+
+# class
+class MinimaxPlayer:
+    """ Minimax TicTacToe AI Player!
+
+        This class does the following:
+        - selects a perfect move (random among equally good ones)
+        - selects initial symbols if invoked
+    """
+
+    def __init__(self, seed=None):
+        """ Initializes the ai.
+        """
+
+        self.play_index = 0
+        self.symbol = '?'
+        self.opponent = None
+        self.rng = make_rng(seed)
+
+    def choose_symbol(self, quiet=False):
+        """ (Invoked if winner of initialcoin flip)
+
+            Randomly select a symbol for self.
+            (Also set opponent's to the opposite symbol)
+        """
+
+        if not quiet:
+            print("Player " + str(self.play_index) + " wins the coin flip!")
+            print("Player " + str(self.play_index) + ", choose a symbol: X, O")
+
+        self.symbol = self.rng.choice(['X', 'O'])
+        if self.symbol == 'X':
+            self.opponent.symbol = 'O'
+        elif self.symbol == 'O':
+            self.opponent.symbol = 'X'
+
+        if not quiet:
+            print("Player " + str(self.play_index) + " chooses " + self.symbol + "!")
+            print("Player " + str(self.opponent.play_index) + "'s symbol is " + self.opponent.symbol + ".")
+
+    def go(self, game, debug=False, detail=False):
+        """ Picks the next best move by solving the game.
+        """
+
+        mine = Bitboard.mask_of(game.board, self.symbol)
+        theirs = Bitboard.mask_of(game.board, self.opponent.symbol)
+
+        cells, best_score = Solver.best_cells(mine, theirs)
+        if not cells:
+            return None
+        best_moves = [Bitboard.MOVES[i] for i in cells]
+
+        if debug:
+            print("Perfect moves (value " + str(best_score) + "): " + str(best_moves))
+
+        return self.rng.choice(best_moves)
@@ -5,9 +5,6 @@
 # Desc:         A Node class for the Monte Carlo Tree.
 # -------------------------------------------------- #
 
-# imports
-from copy import deepcopy as copy
-
 # class
 class MonteCarloNode:
     """ Monte-Carlo Node!
@@ -21,39 +18,54 @@ class MonteCarloNode:
         """
 
         self.player = player # the player who just made a move
-        self.state = state # the board AFTER the player made a move
+        self.state = state # the board (bitboard int) AFTER the player made a move
         self.p = parent # the node of the board BEFORE the player made a move
         self.move = move # the move player just made (to get to this state)
         self.wins = wins # number of times this player won in simulations
         self.sims = sims # number of times this player has played simulations
-        self.c = copy(children) # list of states resulting from all possible moves the opponent can make
-        self.mcts_curr = False # if this is the current node being processed in MCTS (for debugging)
+        self.c = list(children) # list of states resulting from all possible moves the opponent can make
+        self.cm = [child.move for child in children] # move leading to each child (parallel to 'c')
+        self.cp = None # prior of each child (parallel to 'c'), when an evaluator gave them
+        self.vl = 0 # virtual losses of searches currently passing through (tree-parallel mcts)
+        self.proven = 0 # proven outcome for this player (an OUTCOME_* code, 0 while unknown)
+        self.final = None # outcome for the player to move here (0 if the game goes on), once known
+        self.moves = None # moves to expand, in order (the first amount() have children), once known
+        self.amaf = None # RAVE: move (tuple) -> [wins, visits] of the player to move here, all moves as first
 
         if parent:
-            parent.c.append(self)
-
-        if move:
-            state[move[1]][move[0]] = player.symbol # apply a previous move
+            parent.link(self, move)
 
-    def _to_str(self, detailed=False, prefix=""):
+    def _to_str(self, detailed=False, prefix="", describe=None, curr=None):
         """ Returns self's sub-tree in the form of a string
+
+            * 'describe' turns a state into rows of text
+              (the game's 'describe') for detailed output. *
+            * 'curr' is marked as the node being processed. *
+            * Lines are collected (depth first, without
+              recursion) and joined once at the end. *
         """
 
-        is_it = ""
-        pfx = "" + prefix
-        if self.mcts_curr:
-            is_it = "=> "
-            pfx = prefix[0:-3] + is_it
+        lines = []
+        stack = [(self, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+
+            pfx = prefix
+            if curr is not None and node == curr:
+                pfx = prefix[0:-3] + "=> "
 
-        s = pfx + "Node: w=" + str(self.wins) + " s=" + str(self.sims) + " mv=" + str(self.move) + " p=" + str(self.player.play_index)
-        if detailed:
-            s += '\n' + prefix + str(self.state[0]) + '\n' + prefix + str(self.state[1]) + '\n' + prefix + str(self.state[2])
-        s += '\n'
+            line = pfx + "Node: w=" + str(node.wins) + " s=" + str(node.sims) + " mv=" + str(node.move) + " p=" + str(node.player.play_index)
+            if node.proven:
+                line += " proven=" + str(node.proven)
+            lines.append(line)
+            if detailed:
+                rows = describe(node.state) if describe is not None else [str(node.state)]
+                for row in rows:
+                    lines.append(prefix + row)
 
-        for child in self.c:
-            s += child._to_str(detailed, prefix + prefix)
+            stack.extend((child, prefix + prefix) for child in reversed(node.c))
 
-        return s
+        return '\n'.join(lines) + '\n'
 
     def amount(self):
         """ Number of children.
@@ -61,14 +73,53 @@ class MonteCarloNode:
 
         return len(self.c)
 
-    def make_leaf(self, move):
-        """ Creates a leaf node given a move.
+    def link(self, child, move):
+        """ Adds an existing node as a child reached by 'move'.
+
+            * A node shared through a transposition table may be
+              reached by a different move from each parent, so
+              always use 'cm' rather than 'child.move'. *
+        """
+
+        self.c.append(child)
+        self.cm.append(move)
+
+    def prune(self):
+        """ Drops every child (and so every node only
+            reachable through them), keeping the node's own
+            statistics. Its moves are all untried again.
+        """
+
+        self.c = []
+        self.cm = []
+        self.cp = None
+
+    def unlink(self, child):
+        """ Removes a child; the move to it is untried again.
+
+            * Children given priors (see MonteCarloTree._flush)
+              are never removed: their moves would be lost. *
+        """
+
+        if self.cp is not None or self.moves is None:
+            return
+        for i, node in enumerate(self.c):
+            if node is child:
+                # new lists, so that threads reading the old ones still see them whole
+                self.c = self.c[:i] + self.c[i + 1:]
+                self.cm = self.cm[:i] + self.cm[i + 1:]
+                self.moves.append(self.moves.pop(i)) # (the first amount() moves have children)
+                return
+
+    def make_leaf(self, move, state):
+        """ Creates a leaf node given a move and
+            the board after that move was applied.
             Also returns the created node.
         """
 
         return MonteCarloNode(
             self.player.opponent,
-            copy(self.state),
+            state,
             self,
             move
         )
@@ -7,10 +7,15 @@
 
 # imports
 import time
-import random
 import math
-from copy import deepcopy as copy
+import threading
+import contextlib
+import UCT
 from MonteCarloNode import MonteCarloNode
+import NodeStore as Store
+from NodeStore import NodeStore, NodeView
+from SearchStats import SearchStats, clock
+from Seeding import make_rng, derive
 
 # constants
 # change these if you know what you are doing
@@ -22,6 +27,19 @@ OUTCOME_NONE = 0
 OUTCOME_WIN  = 1
 OUTCOME_LOSE = 2
 OUTCOME_DRAW = 3
+# the same outcome, seen by the other player
+FLIP = (OUTCOME_NONE, OUTCOME_LOSE, OUTCOME_WIN, OUTCOME_DRAW)
+# most iterations run between clock checks (keeps time.time() out of the hot loop;
+# against a clock, batches are also sized from the pace so far, see _pace)
+CHECK_INTERVAL = 64
+# ms between "Thinking..." prints
+THINK_INTERVAL = 225
+# tree-parallel mcts: locks shared by all nodes, and visits counted as
+# losses for every search passing through a node
+LOCK_STRIPES = 64
+VIRTUAL_LOSS = 1
+# stands in for a lock stripe when only one thread searches
+NO_LOCK = contextlib.nullcontext()
 
 # macros
 now = lambda: int(round(time.time() * 1000)) # in milliseconds
@@ -38,49 +56,114 @@ class MonteCarloTree:
         * making a tree by itself is NOT useful *
     """
 
-    def __init__(self, player, state, dtl=False):
+    def __init__(self, player, state, dtl=False, table=None, compact=False, seed=None, key=None):
         """ Initializes the a monte-carlo tree.
+
+            * If a TranspositionTable is passed as 'table',
+              positions reached by different move orders share
+              a single node (the tree becomes a DAG). *
+            * If 'compact', nodes are kept in a NodeStore
+              (parallel arrays) instead of node objects.
+              (can't be combined with a table) *
+            * Every random choice comes from the tree's own
+              stream, seeded by 'seed' (int or random.Random). *
+            * 'key' maps a state to its table key (the game's
+              'hash'); states are their own keys by default. *
         """
 
-        self.root = MonteCarloNode(
-            player      = player.opponent, # 1st state is of current player's opponent
-            state       = copy(state), # we don't want to edit the actual game board!
-            parent      = None,
-            move        = None, # can ignore move, if any, which got us to the root node
-            wins        = 0, # how many wins this node got in mcts so far
-            sims        = 0, # how many simulations this node played out so far
-            children    = [] # list of child nodes as a result of different possible moves taken
-        )
+        if compact:
+            if table is not None:
+                raise ValueError('A compact tree can not use a transposition table.')
+            store = NodeStore([player, player.opponent])
+            self.root = store.view(store.add(player.opponent, state))
+        else:
+            self.root = MonteCarloNode(
+                player      = player.opponent, # 1st state is of current player's opponent
+                state       = state, # boards are ints, so the game board is never edited
+                parent      = None,
+                move        = None, # can ignore move, if any, which got us to the root node
+                wins        = 0, # how many wins this node got in mcts so far
+                sims        = 0, # how many simulations this node played out so far
+                children    = [] # list of child nodes as a result of different possible moves taken
+            )
 
         self.dtl = dtl # for debugging
+        self.iterations = 0 # number of completed mcts iterations
+        self.rollouts = 1 # random playouts per simulated leaf
+        self.rng = make_rng(seed) # random stream for playouts
+        self.table = table # transposition table (None if disabled)
+        self.key = key if key is not None else (lambda s: s)
+        self.describe = None # how to print a state (the game's 'describe')
+        self.locks = None # lock stripes (only while searched by several threads)
+        self.table_lock = None # guards the table (only while searched by several threads)
+        self.symmetric = False # one child per class of symmetric moves (see _expand)
+        self.evaluator = None # scores leaves in batches instead of random playouts (see Evaluator)
+        self.batch = 1 # leaves evaluated together
+        self.queue = [] # paths (root to leaf) of leaves waiting to be evaluated
+        self.pending = set() # leaves in the queue
+        self.stats = None # SearchStats of the searches so far (None unless asked for)
+        self.rave = None # RAVE equivalence parameter (None when RAVE is off, see _backpropagate_amaf)
+        if table is not None:
+            table.put(self.key(state), self.root)
 
     def __str__(self):
         """ Replaces default print behavior by printing  tree node data
         """
 
+        return self._to_str()
+
+    def _to_str(self, curr=None):
+        """ Returns the tree as a string, marking node 'curr'
+            (the node being processed) if given.
+        """
+
         s = '\n'
         s += 'Monte Carlo Tree:\n'
-        s += self.root._to_str(self.dtl, '    ')
+        s += self.root._to_str(self.dtl, '    ', self.describe, curr)
         return s
 
+    def _lock(self, node):
+        """ Returns the lock stripe guarding 'node'.
+        """
+
+        if self.locks is None:
+            return NO_LOCK
+        return self.locks[hash(node) % LOCK_STRIPES]
+
     def best_move(self, dbg):
         """ Returns the next best move. If no moves
             left, returns None.
+
+            * A move proven to win is picked straight away, and
+              moves proven to lose only when nothing else is left. *
         """
 
         most_wins = -math.inf
-        bestt_child = None
+        best_child = None
+        best_move = None
         wins_lst = []
         move_lst = []
-        
-        for child in self.root.c:
+
+        # proven results first
+        children = self.root.c
+        for child, move in zip(children, self.root.cm):
+            if child.proven == OUTCOME_WIN:
+                if dbg:
+                    print("Proven win: " + str(move))
+                return move
+        avoid = OUTCOME_LOSE if any(child.proven != OUTCOME_LOSE for child in children) else None
+
+        for child, move in zip(children, self.root.cm):
+            if child.proven == avoid:
+                continue
             wins = child.wins
             if dbg:
                 wins_lst.append(wins)
-                move_lst.append(child.move)
+                move_lst.append(move)
             if most_wins < wins:
                 most_wins = wins
                 best_child = child
+                best_move = move
 
         if dbg:
             print("Final move selection:")
@@ -88,15 +171,164 @@ class MonteCarloTree:
                 w = wins_lst[i]
                 m = move_lst[i]
                 print("Score = " + str(w) + " for move: " + str(m))
-            print("Best move: " + str(best_child.move))
+            print("Best move: " + str(best_move))
 
         if best_child is None:
             return None
 
-        return best_child.move
+        return best_move
+
+    def reroot(self, state, max_depth=2):
+        """ Re-roots the tree at the descendant whose board
+            matches 'state' (searching at most 'max_depth'
+            moves down), keeping that node's sub-tree and its
+            statistics. Returns True if such a node was found.
+
+            * The new root's parent pointer is detached so the
+              rest of the old tree can be freed. (a compact
+              tree copies the sub-tree into a new store) *
+        """
+
+        # a shared node may have been reached by another move order (with another last move)
+        same = self.key if self.table is not None and not self.symmetric else (lambda s: s)
+        target = same(state)
+        level = [self.root]
+        for _ in range(max_depth + 1):
+            for node in level:
+                if same(node.state) == target:
+                    if isinstance(node, NodeView):
+                        node = node.s.subtree(node.i)
+                    node.p = None
+                    self.root = node
+                    if self.table is not None:
+                        self._retable()
+                    return True
+            level = [child for node in level for child in node.c]
+
+        return False
+
+    def save(self, path):
+        """ Saves the tree (from its root) to a compact
+            binary file: packed arrays of wins, visits, parent
+            and child indices, moves and boards (see
+            NodeStore.save).
+
+            * Node trees are copied into a store first; nodes
+              shared through a transposition table are only
+              saved under their first parent. *
+        """
+
+        root = self.root
+        if not isinstance(root, NodeView):
+            store = Store.from_nodes(root)
+        elif root.i == 0:
+            store = root.s
+        else:
+            store = root.s.subtree(root.i).s
+        store.save(path)
+
+    @staticmethod
+    def load(path, game, mapped=False):
+        """ Static method:
+            Loads a tree saved with 'save' as a compact tree
+            for 'game' (whose players the nodes belong to).
+
+            * If 'mapped', the file is memory-mapped (zero-copy)
+              and the tree is read-only: good for analysis, or
+              to re-root (which copies the sub-tree out) before
+              searching on. *
+            * Nodes are matched to players by whose turn it is
+              in 'game' at the root, not by play index. *
+        """
+
+        store = Store.load(path, [game.p1, game.p2], mapped)
+        root = store.view(0)
+        if root.player.opponent is not game.to_move(root.state):
+            store.players = {i: p.opponent for i, p in store.players.items()}
+
+        tree = MonteCarloTree(root.player.opponent, root.state, compact=True)
+        tree.root = root
+        return tree
+
+    @staticmethod
+    def prime(game, stats, dtl=False, table=None, compact=False, symmetric=False):
+        """ Static method:
+            Returns a new tree for the game's board whose root
+            is expanded with its children's statistics taken
+            from 'stats' (move (tuple) -> (wins, sims), as
+            root_stats returns), ready to be searched on.
+
+            * Moves missing from 'stats' start from nothing. *
+        """
+
+        key = game.canonical if symmetric else game.hash
+        tree = MonteCarloTree(game.to_move(game.board), game.board, dtl, table, compact, key=key)
+        root = tree.root
+        MonteCarloTree._expand(game, root, table, symmetric)
+        for child, move in zip(root.c, root.cm):
+            wins, sims = stats.get(tuple(move), (0, 0))
+            child.wins += wins
+            child.sims += sims
+            root.wins += sims - wins # scores of both players add up to 1 per playout
+            root.sims += sims
+        return tree
+
+    def _retable(self):
+        """ Refills the transposition table with only the
+            nodes reachable from the root, so positions left
+            behind by a re-root can be freed.
+
+            * Nodes are added closest to the root first, until
+              the table is full (refilling never evicts). *
+        """
+
+        table = self.table
+        table.clear()
+        level = [self.root]
+        while level and (table.capacity is None or len(table) < table.capacity):
+            below = []
+            for node in level:
+                key = self.key(node.state)
+                if key not in table:
+                    if table.capacity is not None and len(table) >= table.capacity:
+                        return
+                    table.put(key, node)
+                    below.extend(node.c)
+            level = below
+
+    def root_stats(self):
+        """ Returns the root's children statistics as a
+            dictionary of: move (tuple) -> (wins, sims)
+        """
+
+        return {tuple(move): (child.wins, child.sims) for child, move in zip(self.root.c, self.root.cm)}
 
     def best_child(self, n, C, dtl=False):
         """ Returns the maximum-UCT scoring child from node 'n'
+            (PUCT when its children have priors), skipping proven
+            children (None if every child is proven).
+
+            * Scores come from the lookup tables in UCT; with
+              'dtl' every score is printed (see _best_child_dtl). *
+        """
+
+        if dtl:
+            return self._best_child_dtl(n, C)
+
+        # compact trees score straight from the arrays
+        if isinstance(n, NodeView):
+            i = n.s.best_child(n.i, C)
+            return None if i is None else n.s.view(i)
+
+        if n.cp is None:
+            if self.rave is not None and n.amaf:
+                return UCT.best_rave(n.c, n.cm, n.amaf, n.sims + n.vl, C, self.rave)
+            return UCT.best(n.c, n.sims + n.vl, C)
+        return UCT.best_puct(n.c, n.cp, n.sims + n.vl, C, DRAW_SCORE)
+
+    def _best_child_dtl(self, n, C):
+        """ Same as best_child, but prints the score of every
+            child (computed with _UCT / _PUCT).
         """
 
         # init vars
@@ -107,69 +339,443 @@ class MonteCarloTree:
         scors = []
         moves = []
 
-        # search children
-        for child in children:
-            pts = MonteCarloTree._UCT(child, C)
-            if dtl:
-                scors.append(pts)
-                moves.append(child.move)
+        # search children (PUCT when the children have priors)
+        parent_sims = n.sims + n.vl
+        priors = n.cp
+        amaf = n.amaf if self.rave is not None else None
+        if priors is not None:
+            parent_sims = math.sqrt(parent_sims)
+        for i, (child, move) in enumerate(zip(children, n.cm)):
+            if child.proven:
+                print("Proven (" + str(child.proven) + ") move: " + str(move))
+                continue
+            if amaf and priors is None:
+                pts = MonteCarloTree._RAVE(child, amaf.get(tuple(move)), C, parent_sims, self.rave)
+            elif priors is None:
+                pts = MonteCarloTree._UCT(child, C, parent_sims)
+            else:
+                pts = MonteCarloTree._PUCT(child, priors[i], C, parent_sims)
+            scors.append(pts)
+            moves.append(move)
             if max_pts < pts:
                 max_pts = pts
                 max_pts_child = child
 
-        if dtl:
-            for i in range(len(scors)):
-                s = scors[i]
-                m = moves[i]
-                print("UCT = " + str(s) + " for move: " + str(m))
-
-        # if children exist AND
-        # if all children have -infinity scores,
-        # just return the 1st child:
+        for i in range(len(scors)):
+            s = scors[i]
+            m = moves[i]
+            print("UCT = " + str(s) + " for move: " + str(m))
+
+        # if all unproven children have -infinity scores,
+        # just return the 1st of them:
         if max_pts_child is None:
-            if n.amount():
-                return n.c[0]
+            return next((child for child in children if not child.proven), None)
 
         # return biggest winner
         return max_pts_child
 
     @staticmethod
-    def search(game, time_limit, uct_const, dbg=False, dtl=False):
+    def search(game, time_limit, uct_const, dbg=False, dtl=False, iterations=None, verbose=True, tree=None, table=None,
+               rollouts=1, compact=False, seed=None, threads=1, evaluator=None, batch=1, symmetric=False,
+               stats=False, hook=None, rave=None):
         """ Static method:
             Runs the famous MCTS algorithm by creating a
             tree, running selection, expansion, simulation,
             and backpropagation on it, then after the time
-            limit is reached, returns the tree.
+            limit or iteration budget is reached, returns
+            the tree.
 
-            - 'game' is a TicTacToe game object
-            - 'time_limit' is limit (ms) of mcts runtime
+            - 'game' is any game implementing the Game protocol
+            - 'time_limit' is limit (ms) of mcts runtime (None for no limit)
             - 'uct_const' is a constant that determines exploration
+            - 'iterations' is the max number of mcts iterations (None for no limit)
+            - 'verbose' prints "Thinking..." while searching
+            - 'tree' is an existing tree (rooted at the game's
+              current board) to keep searching, if any
+            - 'table' is a TranspositionTable for a new tree, if any
+            - 'rollouts' is the number of random playouts per
+              simulated leaf (batched when the game supports it)
+            - 'compact' stores a new tree's nodes in parallel arrays
+            - 'seed' (int or random.Random) seeds the tree's random
+              stream; with an iteration budget, the same seed
+              always builds the same tree (single thread only)
+            - 'threads' above 1 searches tree-parallel: that many
+              threads descend the same tree at once (see _run_shared)
+            - 'evaluator' (see Evaluator) scores leaves instead of
+              random playouts ('rollouts' is then ignored), 'batch'
+              leaves at a time (see _select_queued)
+            - 'symmetric' expands one child per class of moves
+              that are the same up to a board symmetry, pooling
+              their statistics (set it the same way for the
+              whole life of a tree)
+            - 'stats' records SearchStats into the tree's 'stats',
+              calling 'hook' (which turns 'stats' on) on every event
+            - 'rave' (the equivalence parameter, e.g. 300) blends
+              all-moves-as-first statistics into selection (see
+              UCT.best_rave); single threaded node trees with one
+              random playout per leaf only
+
+            * At least one of 'time_limit' or 'iterations' must be set. *
+            * Per-phase statistics are only recorded by single
+              threaded searches with random playouts. *
         """
 
         # setup tree
-        tree = MonteCarloTree(game.curr(), copy(game.board), dtl)
-        time_interval = 225 # for "thinking..." effect
-        
+        if tree is None:
+            key = game.canonical if symmetric else game.hash
+            tree = MonteCarloTree(game.to_move(game.board), game.board, dtl, table, compact, seed, key)
+        elif seed is not None:
+            tree.rng = make_rng(seed)
+        tree.rollouts = rollouts
+        tree.describe = game.describe
+        tree.symmetric = symmetric
+        MonteCarloTree._use_evaluator(tree, evaluator, batch, threads)
+        MonteCarloTree._use_stats(tree, stats, hook)
+        MonteCarloTree._use_rave(tree, rave, threads)
+
         # search tree
-        MonteCarloTree._select(
-            game,
-            tree,
-            tree.root,
-            uct_const,
-            now() + time_limit, # end time
-            now() - time_interval, # last time
-            time_interval,
-            dbg,
-            dtl
-        )
+        if threads > 1:
+            MonteCarloTree._run_shared(game, tree, uct_const, time_limit, iterations, threads, verbose)
+            return tree
+        for _ in MonteCarloTree._run(game, tree, uct_const, time_limit, iterations, None, dbg, dtl, verbose):
+            pass
 
         # return tree
         return tree
 
     @staticmethod
-    def _select(g, t, n, c, te, tl, intv, dbg, dtl):
-        """ Scores the tree by selecting the best move every
-            until the time limit is reached.
+    def anytime(game, time_limit, uct_const, every=100, dbg=False, dtl=False, iterations=None, verbose=True, tree=None, table=None,
+                rollouts=1, compact=False, seed=None, evaluator=None, batch=1, symmetric=False, stats=False, hook=None,
+                rave=None):
+        """ Static method (generator):
+            Same as 'search', but yields the current best
+            move estimate every 'every' iterations as a
+            tuple: (iterations so far, best move). The final
+            estimate is always yielded when the budget runs out.
+
+            * Stop iterating at any time to stop the search early. *
+        """
+
+        # setup tree
+        if tree is None:
+            key = game.canonical if symmetric else game.hash
+            tree = MonteCarloTree(game.to_move(game.board), game.board, dtl, table, compact, seed, key)
+        elif seed is not None:
+            tree.rng = make_rng(seed)
+        tree.rollouts = rollouts
+        tree.describe = game.describe
+        tree.symmetric = symmetric
+        MonteCarloTree._use_evaluator(tree, evaluator, batch)
+        MonteCarloTree._use_stats(tree, stats, hook)
+        MonteCarloTree._use_rave(tree, rave)
+        start = tree.iterations
+
+        # search tree, reporting along the way
+        reported = -1
+        for done in MonteCarloTree._run(game, tree, uct_const, time_limit, iterations, every, dbg, dtl, verbose):
+            reported = done
+            yield done, tree.best_move(False)
+
+        # final estimate
+        done = tree.iterations - start
+        if reported != done:
+            yield done, tree.best_move(False)
+
+    @staticmethod
+    def _use_evaluator(t, evaluator, batch, threads=1):
+        """ Sets up (or turns off, if None) batched leaf
+            evaluation on tree 't'.
+        """
+
+        if evaluator is not None:
+            if threads > 1:
+                raise ValueError('Batched evaluation can not be combined with several threads.')
+            if isinstance(t.root, NodeView):
+                raise ValueError('A compact tree can not be searched with an evaluator.')
+        t.evaluator = evaluator
+        t.batch = batch
+
+    @staticmethod
+    def _use_stats(t, stats, hook):
+        """ Sets up (or turns off) SearchStats on tree 't',
+            keeping the statistics of earlier searches.
+        """
+
+        if not stats and hook is None:
+            t.stats = None
+            return
+        if t.stats is None:
+            t.stats = SearchStats()
+        t.stats.hook = hook
+
+    @staticmethod
+    def _use_rave(t, rave, threads=1):
+        """ Turns RAVE on (with equivalence parameter 'rave')
+            or off (if None) on tree 't'.
+        """
+
+        if rave is not None:
+            if threads > 1 or t.evaluator is not None or isinstance(t.root, NodeView):
+                raise ValueError('RAVE needs a single threaded search of a node tree, without an evaluator.')
+            if t.rollouts > 1:
+                raise ValueError('RAVE needs one random playout per leaf (rollouts=1).')
+        t.rave = rave
+
+    @staticmethod
+    def _run(g, t, c, time_limit, iterations, every, dbg, dtl, verbose=True):
+        """ Generator:
+            Runs mcts iterations on tree 't' until the time
+            limit or iteration budget is reached. Yields the
+            number of iterations done every 'every' iterations
+            (never, if 'every' is None).
+
+            * The clock is only checked once per batch of
+              (at most) CHECK_INTERVAL iterations; against a
+              clock, batches only hold what the time left fits
+              (see _pace). *
+        """
+
+        if time_limit is None and iterations is None:
+            raise ValueError('Search needs a time limit, an iteration budget, or both.')
+        if isinstance(t.root, NodeView) and t.root.s.mapped:
+            raise ValueError('A memory-mapped tree is read-only (re-root it, or load it unmapped, to search it).')
+
+        # prepare variables (tracing only costs when asked for)
+        if t.evaluator is not None:
+            SELECT = MonteCarloTree._select_queued
+        elif dbg or dtl or t.stats is not None:
+            SELECT = MonteCarloTree._select_traced
+        else:
+            SELECT = MonteCarloTree._select
+        start_time = now()
+        end_time = None if time_limit is None else start_time + time_limit
+        last_time = start_time - THINK_INTERVAL # for "thinking..." effect
+        done = 0
+        batch = 0
+
+        # search loop (in batches)
+        try:
+            while True:
+
+                # size the next batch
+                if end_time is None:
+                    batch = CHECK_INTERVAL
+                else:
+                    batch = MonteCarloTree._pace(batch, done, start_time, end_time)
+                if iterations is not None:
+                    batch = min(batch, iterations - done)
+                if every:
+                    batch = min(batch, every - done % every)
+
+                # run the batch
+                for _ in range(batch):
+                    if not SELECT(g, t, c, dbg, dtl):
+                        if dbg:
+                            print("Final game state reached.")
+                        return
+                    done += 1
+                    t.iterations += 1
+
+                # against a clock, queued leaves are evaluated within their batch (so it is timed)
+                if end_time is not None and t.queue:
+                    MonteCarloTree._flush(g, t)
+
+                # report progress
+                if every and done % every == 0:
+                    yield done
+
+                # check iteration budget
+                if iterations is not None and done >= iterations:
+                    if dbg:
+                        print('Iteration budget reached!')
+                    return
+
+                # check time (once per batch)
+                if end_time is not None:
+                    stamp = now()
+                    if last_time + THINK_INTERVAL <= stamp:
+                        last_time = stamp
+                        if verbose:
+                            print('Thinking...')
+                        if t.stats is not None:
+                            t.stats.progress(done)
+                    if stamp >= end_time:
+                        if dbg:
+                            print('Time limit reached!')
+                        return
+        finally:
+            # leaves still queued are evaluated, whatever stopped the search
+            if t.queue:
+                MonteCarloTree._flush(g, t)
+
+    @staticmethod
+    def _pace(last, done, start_time, end_time):
+        """ Returns how many iterations the next batch of a
+            search against a clock should run: as many as fit
+            in the time left at the pace of the 'done'
+            iterations run since 'start_time', but no more
+            than twice the 'last' batch or CHECK_INTERVAL (and
+            at least 1).
+
+            * Starting from single iterations, slow iterations
+              (big rollouts, batched evaluators) never run far
+              past 'end_time', while fast ones soon reach full
+              batches. *
+        """
+
+        if done == 0:
+            return 1
+        stamp = now()
+        fit = int((end_time - stamp) * done // max(stamp - start_time, 1))
+        return max(1, min(CHECK_INTERVAL, 2 * last, fit))
+
+    @staticmethod
+    def _run_shared(g, t, c, time_limit, iterations, threads, verbose=True):
+        """ Tree-parallel mcts: runs 'threads' threads that
+            all descend tree 't' at once until the time limit
+            or iteration budget is reached.
+
+            * Each thread searches with its own fork of the
+              game and its own random stream (derived from the
+              tree's), so results are not reproducible. *
+            * Playouts only overlap where they release the GIL
+              (NumPy batch rollouts) or on free-threaded builds
+              of Python. *
+            * Compact trees can't be searched this way. *
+        """
+
+        if time_limit is None and iterations is None:
+            raise ValueError('Search needs a time limit, an iteration budget, or both.')
+        if isinstance(t.root, NodeView):
+            raise ValueError('A compact tree can not be searched by several threads.')
+
+        # prepare variables
+        start_time = now()
+        end_time = None if time_limit is None else start_time + time_limit
+        left = iterations # iterations not handed out yet (None for no limit)
+        claim_lock = threading.Lock()
+        stop = threading.Event()
+        errors = []
+
+        def claim(last, done):
+            # hands out the next batch of iterations (0 when done), paced on
+            # the 'done' iterations the thread ran since the search started
+            nonlocal left
+            with claim_lock:
+                if stop.is_set() or (end_time is not None and now() >= end_time):
+                    return 0
+                batch = CHECK_INTERVAL if end_time is None else MonteCarloTree._pace(last, done, start_time, end_time)
+                if left is None:
+                    return batch
+                batch = min(batch, left)
+                left -= batch
+                return batch
+
+        def work(game, rng):
+            SELECT = MonteCarloTree._select_shared
+            batch = 0
+            total = 0
+            try:
+                while True:
+                    batch = claim(batch, total)
+                    if batch == 0:
+                        return
+                    done = 0
+                    for _ in range(batch):
+                        if not SELECT(game, t, c, rng):
+                            stop.set()
+                            break
+                        done += 1
+                    total += done
+                    with claim_lock:
+                        t.iterations += done
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        # search tree
+        t.locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        t.table_lock = threading.Lock()
+        workers = [
+            threading.Thread(target=work, args=(g.fork(), make_rng(seed)), daemon=True)
+            for seed in derive(t.rng, threads)
+        ]
+        try:
+            for w in workers:
+                w.start()
+            for w in workers:
+                while w.is_alive():
+                    w.join(THINK_INTERVAL / 1000)
+                    if verbose and end_time is not None and w.is_alive():
+                        print('Thinking...')
+        finally:
+            stop.set()
+            t.locks = None
+            t.table_lock = None
+
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _select(g, t, c, dbg, dtl):
+        """ Runs a single mcts iteration: selects the best
+            nodes down from the root until a leaf is
+            simulated (or a final state is reached), then
+            backpropagates the result.
+
+            * Returns False if the root itself is a final
+              state (nothing left to search). *
+            * Prints and records nothing ('dbg' and 'dtl' are
+              only for a common signature, see _select_traced). *
+            * Nodes are expanded one move at a time (compact
+              trees: all at once). *
+        """
+
+        # prepare variables
+        n = t.root
+        path = None if t.table is None else [n] # actual path taken (nodes can have many parents)
+        compact = isinstance(n, NodeView)
+        OUTCOME = MonteCarloTree._outcome
+        EXPAND = MonteCarloTree._expand
+        EXPAND_NEXT = MonteCarloTree._expand_next
+
+        # selection loop
+        while True:
+
+            # check state (final, or already proven)
+            result = OUTCOME(g, n)
+            if result != OUTCOME_NONE:
+                if n == t.root:
+                    return False
+                MonteCarloTree._settle(t, n, result, path)
+                return True
+
+            # simulate unvisited leaves
+            if n.sims == 0 and n != t.root:
+                MonteCarloTree._rollout(g, t, n, t.rng, path)
+                return True
+
+            # expand the next untried move, or pick best UCT valued child
+            if compact and (n.amount() == 0 or n.partial):
+                known = n.amount()
+                EXPAND(g, n, t.table, t.symmetric)
+                n = n.c[known]
+            elif not compact and MonteCarloTree._untried(g, n, t.symmetric):
+                n = EXPAND_NEXT(g, n, t.table, t.symmetric, t.rave is not None)
+            else:
+                child = t.best_child(n, c)
+                if child is None: # every child proven (through another parent)
+                    n.proven = MonteCarloTree._solved(n)
+                    continue
+                n = child
+            if path is not None:
+                path.append(n)
+
+    @staticmethod
+    def _select_traced(g, t, c, dbg, dtl):
+        """ Same as _select, but also prints every step (if
+            'dbg'), prints UCT values (if 'dtl') and records
+            the tree's SearchStats (if any).
         """
 
         # prepare variables
@@ -177,134 +783,518 @@ class MonteCarloTree:
             if dbg:
                 print(o)
         debug("Preparing initial variables...")
-        def SELECT(node):
-            nonlocal n
-            n.mcts_curr = False
-            n = node
-            n.mcts_curr = True
+        stats = t.stats
+        mark = clock()
+        n = t.root
+        depth = 0
+        path = None if t.table is None else [n] # actual path taken (nodes can have many parents)
+        compact = isinstance(n, NodeView)
+        OUTCOME = MonteCarloTree._outcome
         EXPAND = MonteCarloTree._expand
-        SIMULATE = MonteCarloTree._simulate
-        BACKPROP = MonteCarloTree._backpropagate
-        orig_player = g.curr()
-        n.mcts_curr = True
+        EXPAND_NEXT = MonteCarloTree._expand_next
 
-        # search loop
+        # selection loop
         while True:
 
             # debugging
-            debug(t)
-
-            # check time
-            debug("Checking time limit...")
-            if tl + intv <= now():
-                tl = now()
-                print('Thinking...')
-            if now() >= te:
-                debug('Time limit reached!')
-                return
-
-            # prepare variables
-            debug("Preparing variables...")
-            curr_player = n.player.opponent
-            curr_board = n.state
+            if dbg:
+                debug(t._to_str(n))
 
-            # check state
+            # check state (final, or already proven)
             debug("Checking game state...")
-            result = g.check(curr_player, curr_board)
-            if result is not OUTCOME_NONE:
-                if n is t.root:
-                    debug("Final game state reached.")
-                    continue
-                else:
-                    debug("Final game state reached, backpropagating...")
-                    BACKPROP(n, result, woff=math.inf, loff=-math.inf)
-                    SELECT(t.root)
-                    continue
+            result = OUTCOME(g, n)
+            if result != OUTCOME_NONE:
+                if n == t.root:
+                    debug("Root proven." if n.proven else "Final game state reached.")
+                    return False
+                debug("Final game state reached, backpropagating...")
+                if stats is not None:
+                    mark = stats.lap('select', mark)
+                MonteCarloTree._settle(t, n, result, path)
+                if stats is not None:
+                    stats.lap('backprop', mark)
+                    stats.ended(depth, terminal=True)
+                return True
 
-            # check # of simulations
+            # simulate unvisited leaves
             debug("Checking number of simulations...")
-            sims = n.sims
-            if sims is 0:
-                if n is not t.root:
-                    debug("No simulations found, simulating and backpropagating...")
-                    sim_result = SIMULATE(g, n)
-                    BACKPROP(n, sim_result)
-                    SELECT(t.root)
-                    continue
+            if n.sims == 0 and n != t.root:
+                debug("No simulations found, simulating and backpropagating...")
+                if stats is not None:
+                    mark = stats.lap('select', mark)
+                MonteCarloTree._rollout(g, t, n, t.rng, path, stats=stats, mark=mark)
+                if stats is not None:
+                    stats.ended(depth)
+                return True
 
-            # check # of children
-            debug("Checking number of children...")
-            number_of_children = n.amount()
-            if number_of_children is 0:
+            # expand the next untried move, or pick best UCT valued child
+            debug("Checking untried moves...")
+            if compact and (n.amount() == 0 or n.partial):
                 debug("No children found, expanding...")
-                EXPAND(g, n)
-                first_child = n.c[0]
-                SELECT(first_child)
-                continue
-            
-            # pick best UCT valued child
+                if stats is not None:
+                    mark = stats.lap('select', mark)
+                known = n.amount() # children saved from a partial expansion
+                EXPAND(g, n, t.table, t.symmetric)
+                if stats is not None:
+                    mark = stats.lap('expand', mark)
+                    stats.expanded(depth, n.amount())
+                n = n.c[known]
+            elif not compact and MonteCarloTree._untried(g, n, t.symmetric):
+                debug("Untried move found, expanding it...")
+                branching = len(n.moves) if n.amount() == 0 else 0 # counted on the first expansion only
+                if stats is not None:
+                    mark = stats.lap('select', mark)
+                n = EXPAND_NEXT(g, n, t.table, t.symmetric, t.rave is not None)
+                if stats is not None:
+                    mark = stats.lap('expand', mark)
+                    if branching:
+                        stats.expanded(depth, branching)
             else:
                 debug("Children found, selecting highest probable child...")
-                SELECT(t.best_child(n, c, dtl))
+                child = t.best_child(n, c, dtl)
+                if child is None: # every child proven (through another parent)
+                    n.proven = MonteCarloTree._solved(n)
+                    continue
+                n = child
+            depth += 1
+            if path is not None:
+                path.append(n)
+
+    @staticmethod
+    def _select_queued(g, t, c, dbg, dtl):
+        """ Runs a single mcts iteration that queues its leaf
+            for the tree's evaluator instead of simulating it.
+            Once 'batch' leaves are queued they are evaluated
+            together (see _flush).
+
+            * Every node picked on the way down carries a
+              virtual loss until its leaf is evaluated, so the
+              queued selections spread over different leaves. *
+            * Picking a leaf that is already queued evaluates
+              the queue early, then selects again (so every
+              iteration evaluates or settles a leaf). *
+            * A node left with untried moves (the table took
+              some of its children, see TranspositionTable.put)
+              is queued again, to get them back. *
+            * Returns False if the root itself is a final
+              state (nothing left to search). *
+        """
+
+        # prepare variables
+        n = t.root
+        path = [n]
+        OUTCOME = MonteCarloTree._outcome
+        n.vl += VIRTUAL_LOSS
+
+        # selection loop
+        while True:
+
+            # check state (final, or already proven)
+            result = OUTCOME(g, n)
+            if result != OUTCOME_NONE:
+                if n == t.root:
+                    n.vl -= VIRTUAL_LOSS
+                    if dbg:
+                        print("Final game state reached.")
+                    return False
+                MonteCarloTree._settle(t, n, result, path, shared=True)
+                return True
+
+            # queue unexpanded leaves
+            if n.amount() == 0 or len(n.moves) > n.amount():
+                if n in t.pending:
+                    for node in path:
+                        node.vl -= VIRTUAL_LOSS
+                    MonteCarloTree._flush(g, t)
+                    n = t.root
+                    path = [n]
+                    n.vl += VIRTUAL_LOSS
+                    continue
+                t.pending.add(n)
+                t.queue.append(path)
+                if len(t.queue) >= t.batch:
+                    MonteCarloTree._flush(g, t)
+                return True
+
+            # pick best child
+            child = t.best_child(n, c, dtl)
+            if child is None: # every child proven (through another parent)
+                n.proven = MonteCarloTree._solved(n)
                 continue
+            n = child
+            n.vl += VIRTUAL_LOSS
+            path.append(n)
+
+    @staticmethod
+    def _flush(g, t):
+        """ Evaluates every queued leaf in a single call to
+            the tree's evaluator, then expands each leaf (its
+            children get the returned priors) and
+            backpropagates its value.
+        """
+
+        paths = t.queue
+        t.queue = []
+        t.pending.clear()
+        leaves = [path[-1] for path in paths]
+        results = t.evaluator.evaluate(g, [leaf.state for leaf in leaves], [leaf.player.opponent for leaf in leaves], t.rng)
+
+        for path, leaf, (value, priors) in zip(paths, leaves, results):
+            MonteCarloTree._expand(g, leaf, t.table, t.symmetric)
+            if priors is not None:
+                prior_of = {tuple(mv): p for mv, p in zip(g.legal_moves(leaf.state), priors)}
+                if t.symmetric:
+                    # a child stands for its whole class of moves
+                    prior_of = {tuple(moves[0]): sum(prior_of[tuple(mv)] for mv in moves) for moves in g.move_classes(leaf.state)}
+                priors = [prior_of[tuple(mv)] for mv in leaf.cm] # (kept children come first)
+            leaf.cp = priors
+            MonteCarloTree._backpropagate_shared(t, path, (1, value, WIN_SCORE + LOSE_SCORE - value))
 
     @staticmethod
-    def _expand(game, leaf):
+    def _select_shared(g, t, c, rng):
+        """ Runs a single mcts iteration like _select, on a
+            tree that other threads are searching too.
+
+            * Every node picked on the way down carries a
+              virtual loss until its result is backpropagated,
+              steering the other threads to other children. *
+            * A node's children are picked (and its untried
+              moves expanded) under its lock stripe; statistics
+              are updated under each node's stripe. *
+            * Returns False if the root itself is a final
+              state (nothing left to search). *
+        """
+
+        # prepare variables
+        n = t.root
+        path = [n]
+        OUTCOME = MonteCarloTree._outcome
+        EXPAND_NEXT = MonteCarloTree._expand_next
+        with t._lock(n):
+            n.vl += VIRTUAL_LOSS
+
+        # selection loop
+        while True:
+
+            # check state (final, or already proven)
+            result = OUTCOME(g, n)
+            if result != OUTCOME_NONE:
+                if n == t.root:
+                    with t._lock(n):
+                        n.vl -= VIRTUAL_LOSS
+                    return False
+                MonteCarloTree._settle(t, n, result, path, shared=True)
+                return True
+
+            # simulate unvisited leaves
+            if n.sims == 0 and n != t.root:
+                MonteCarloTree._rollout(g, t, n, rng, path, shared=True)
+                return True
+
+            # expand the next untried move, or pick the best UCT valued child
+            with t._lock(n):
+                if MonteCarloTree._untried(g, n, t.symmetric):
+                    if t.table is None:
+                        child = EXPAND_NEXT(g, n, None, t.symmetric)
+                    else:
+                        with t.table_lock:
+                            child = EXPAND_NEXT(g, n, t.table, t.symmetric)
+                else:
+                    child = t.best_child(n, c)
+                    if child is None: # every child proven (by another thread)
+                        n.proven = MonteCarloTree._solved(n)
+                        continue
+            with t._lock(child):
+                child.vl += VIRTUAL_LOSS
+            path.append(child)
+            n = child
+
+    @staticmethod
+    def _expand(game, leaf, table=None, symmetric=False):
         """ Create child nodes for every action.
+
+            * With a transposition table, positions already
+              in the table are linked instead of created. *
+            * If 'symmetric', only one child is created per
+              class of moves leading to the same position up
+              to a board symmetry (see Game.move_classes); the
+              child's move is a real move on the leaf's board,
+              and the table is keyed by canonical positions. *
+            * A node that still has some of its children (a
+              compact node saved partially expanded, see
+              NodeStore.from_nodes, or a node the table took
+              children from, see TranspositionTable.put) gets
+              the rest. *
         """
 
         # expand
-        current_board = leaf.state
-        moves = game.moves(current_board)
+        legal = game.legal_moves(leaf.state)
+        moves = MonteCarloTree._moves(game, leaf.state, symmetric, legal)
+        if leaf.amount():
+            kept = {tuple(mv) for mv in leaf.cm}
+            moves = [mv for mv in moves if tuple(mv) not in kept]
+        if isinstance(leaf, NodeView):
+            leaf.partial = 0
+        leaf.moves = leaf.cm + moves # (the first amount() moves have children)
         for mv in moves:
-            leaf.make_leaf(mv)
+            MonteCarloTree._grow(game, leaf, mv, legal, table, symmetric)
 
     @staticmethod
-    def _simulate(game, leaf):
+    def _expand_next(game, leaf, table=None, symmetric=False, rave=False):
+        """ Progressive expansion: creates (or links) the
+            child of the leaf's next untried move and returns
+            it (see _untried; moves are tried in order).
+
+            * With 'rave', the untried move with the best AMAF
+              mean is tried first instead. *
+        """
+
+        amaf = leaf.amaf if rave else None
+        if amaf:
+            moves = leaf.moves
+            i = leaf.amount()
+            best = i
+            best_mean = -1.0
+            for j in range(i, len(moves)):
+                stats = amaf.get(tuple(moves[j]))
+                mean = DRAW_SCORE if stats is None else stats[0] / stats[1]
+                if best_mean < mean:
+                    best_mean = mean
+                    best = j
+            moves[i], moves[best] = moves[best], moves[i]
+
+        legal = game.legal_moves(leaf.state) if symmetric else leaf.moves
+        return MonteCarloTree._grow(game, leaf, leaf.moves[leaf.amount()], legal, table, symmetric)
+
+    @staticmethod
+    def _grow(game, leaf, mv, legal, table=None, symmetric=False):
+        """ Creates (or, with a table, links) the child the
+            leaf reaches with move 'mv' and returns it. 'legal'
+            are the leaf's legal moves.
+
+            * The child's outcome and legal moves are worked out
+              once, here, from the move (see Game.step). *
+        """
+
+        state, result, moves = game.step(leaf.state, mv, legal)
+        if table is not None:
+            key = (game.canonical if symmetric else game.hash)(state)
+            node = table.get(key)
+            if node is not None:
+                leaf.link(node, mv)
+                return node
+
+        child = leaf.make_leaf(mv, state)
+        child.final = result
+        child.moves = None if symmetric and moves else moves # symmetry classes are found when needed
+        if table is not None:
+            table.put(key, child)
+        return child
+
+    @staticmethod
+    def _moves(game, state, symmetric, legal=None):
+        """ Returns the moves a node expands: its legal moves
+            ('legal', if already known), or one per symmetry
+            class if 'symmetric'.
+        """
+
+        if symmetric:
+            return [same[0] for same in game.move_classes(state)]
+        return legal if legal is not None else game.legal_moves(state)
+
+    @staticmethod
+    def _untried(game, node, symmetric):
+        """ Returns how many of a node's moves have no child
+            yet (working out its moves on the first call).
+        """
+
+        moves = node.moves
+        if moves is None:
+            moves = node.moves = MonteCarloTree._moves(game, node.state, symmetric)
+        return len(moves) - node.amount()
+
+    @staticmethod
+    def _simulate(game, leaf, rng, played=None):
         """ Default random playout:
                 Simulate the rest of the game randomly
-                until end reached and return the result.
+                (using random stream 'rng') until end
+                reached and return the result.
+                (moves made are appended to 'played', if given)
 
             * Expects that the leaf node has at least 1
               playable move. *
+            * The game plays it out (see Game.playout), so
+              games can do it in place. *
         """
-        
+
+        return game.playout(leaf.state, leaf.player.opponent, rng, played)
+
+    @staticmethod
+    def _simulate_batch(game, leaf, n, rng):
+        """ Plays 'n' random playouts from the leaf and
+            returns the outcome counts as a list indexed by
+            outcome: [-, wins, losses, draws]
+
+            * Uses the game's vectorized 'rollouts' when it
+              supports them, otherwise loops over the default
+              random playout. *
+        """
+
+        # vectorized playouts
+        counts = game.rollouts(leaf.player.opponent, leaf.state, n, rng)
+        if counts is not None:
+            return counts
+
+        # one playout at a time
+        counts = [0, 0, 0, 0]
+        for _ in range(n):
+            counts[MonteCarloTree._simulate(game, leaf, rng)] += 1
+        return counts
+
+    @staticmethod
+    def _outcome(g, n):
+        """ Returns the outcome for the player to move at a
+            node: its proven value if any, otherwise whether
+            its game is over (worked out once per node).
+        """
+
+        if n.proven:
+            return FLIP[n.proven]
+        result = n.final
+        if result is None: # not known yet (roots, compact trees)
+            result = n.final = g.result(n.state, n.player.opponent)
+        return result
+
+    @staticmethod
+    def _settle(t, leaf, result, path, shared=False):
+        """ Ends an iteration on a final (or proven) leaf:
+            proves what it can up the path, then backpropagates
+            the leaf's outcome 'result'.
+
+            * 'shared' backpropagation also takes back the
+              virtual losses on the path (see
+              _backpropagate_shared). *
+        """
+
+        MonteCarloTree._prove(leaf, result, path)
+        if shared:
+            counts = [0, 0, 0, 0]
+            counts[result] = 1
+            MonteCarloTree._backpropagate_shared(t, path, MonteCarloTree._scores(counts))
+        else:
+            MonteCarloTree._backpropagate(leaf, result, path=path)
+            if t.rave is not None:
+                MonteCarloTree._backpropagate_amaf(leaf, result, [], path)
+
+    @staticmethod
+    def _rollout(g, t, leaf, rng, path, shared=False, stats=None, mark=None):
+        """ Ends an iteration on an unvisited leaf: plays the
+            tree's 'rollouts' random playouts from it, then
+            backpropagates their results ('shared' as in
+            _settle).
+
+            * With 'stats', the time since 'mark' is split into
+              the simulate and backprop phases. *
+        """
+
+        # simulate
+        played = None
+        if t.rollouts > 1:
+            counts = MonteCarloTree._simulate_batch(g, leaf, t.rollouts, rng)
+        else:
+            if t.rave is not None:
+                played = []
+            result = MonteCarloTree._simulate(g, leaf, rng, played)
+            if shared:
+                counts = [0, 0, 0, 0]
+                counts[result] = 1
+        if stats is not None:
+            mark = stats.lap('simulate', mark)
+
+        # backpropagate
+        if shared:
+            MonteCarloTree._backpropagate_shared(t, path, MonteCarloTree._scores(counts))
+        elif t.rollouts > 1:
+            MonteCarloTree._backpropagate_counts(leaf, counts, path=path)
+        else:
+            MonteCarloTree._backpropagate(leaf, result, path=path)
+            if played is not None:
+                MonteCarloTree._backpropagate_amaf(leaf, result, played, path)
+        if stats is not None:
+            stats.lap('backprop', mark)
+
+    @staticmethod
+    def _backpropagate_counts(leaf, counts, path=None):
+        """ Updates nodes in path from leaf node to root
+            with a whole batch of playout results at once.
+
+            * 'counts' is indexed by outcome (see _simulate_batch) *
+        """
+
         # prepare variables
-        orig_player = leaf.player.opponent
-        sim_player = leaf.player.opponent
-        sim_board = copy(leaf.state)
-        def move(mv):
-            sim_board[mv[1]][mv[0]] = sim_player.symbol
+        team_orig = leaf.player.opponent.play_index
+        total, orig_wins, opp_wins = MonteCarloTree._scores(counts)
+        nodes = reversed(path) if path is not None else None
+        curr_node = leaf if nodes is None else next(nodes)
 
-        # simulation loop (random tic-tac-toe)
-        while True:
+        # backpropagate:
+        while curr_node is not None:
+            curr_node.sims += total
+            if curr_node.player.play_index == team_orig:
+                curr_node.wins += orig_wins
+            else:
+                curr_node.wins += opp_wins
+            curr_node = curr_node.p if nodes is None else next(nodes, None)
+
+    @staticmethod
+    def _backpropagate_shared(t, path, scores):
+        """ Updates nodes in path (root to leaf) with a batch
+            of results given as scores (see _scores), removing
+            the virtual losses the selection added on the way
+            down. Used when several threads share the tree, or
+            when leaves are evaluated in batches.
+        """
+
+        # prepare variables
+        team_orig = path[-1].player.opponent.play_index
+        total, orig_wins, opp_wins = scores
 
-            # simulate
-            random_move = random.choice(game.moves(sim_board))
-            move(random_move)
+        # backpropagate:
+        for node in reversed(path):
+            with t._lock(node):
+                node.sims += total
+                node.wins += orig_wins if node.player.play_index == team_orig else opp_wins
+                node.vl -= VIRTUAL_LOSS
 
-            # only stop if game ends
-            result = game.check(orig_player, sim_board)
-            if result is not OUTCOME_NONE:
-                return result
+    @staticmethod
+    def _scores(counts):
+        """ Returns a batch of playout results (see
+            _simulate_batch) as: (total playouts, wins for the
+            player to move at the leaf, wins for its opponent)
+        """
 
-            # move to next player
-            sim_player = sim_player.opponent
+        total = counts[OUTCOME_WIN] + counts[OUTCOME_LOSE] + counts[OUTCOME_DRAW]
+        draws = DRAW_SCORE * counts[OUTCOME_DRAW]
+        orig_wins = WIN_SCORE * counts[OUTCOME_WIN] + LOSE_SCORE * counts[OUTCOME_LOSE] + draws
+        opp_wins = WIN_SCORE * counts[OUTCOME_LOSE] + LOSE_SCORE * counts[OUTCOME_WIN] + draws
+        return total, orig_wins, opp_wins
 
     @staticmethod
-    def _backpropagate(leaf, result, woff=0, loff=0, doff=0):
+    def _backpropagate(leaf, result, path=None):
         """ Updates nodes in path from leaf node to root.
 
-            * One-time offsets are also available for each
-              type of result. (will only be applied once in
-              recursion sequence) *
+            * Final states are scored like any other result;
+              what they prove is kept apart (see _prove). *
+            * If the path (root to leaf) is given, it is
+              followed instead of the parent pointers. *
         """
         
         # prepare variables
-        curr_node = leaf
         team_orig = leaf.player.opponent.play_index
         team = lambda n: n.player.play_index
-        parent = lambda n: n.p
+        nodes = reversed(path) if path is not None else None
+        parent = lambda n: n.p if nodes is None else next(nodes, None)
+        curr_node = leaf if nodes is None else next(nodes)
         
         # backpropagate:
         while curr_node is not None:
@@ -315,39 +1305,174 @@ class MonteCarloTree:
             # increment wins if current node is on the same team as the original node
             if result is OUTCOME_WIN:
                 if team(curr_node) is team_orig:
-                    curr_node.wins += WIN_SCORE + woff
+                    curr_node.wins += WIN_SCORE
                 else:
-                    curr_node.wins += LOSE_SCORE + loff
+                    curr_node.wins += LOSE_SCORE
 
             # opposite of above
             if result is OUTCOME_LOSE:
                 if team(curr_node) is team_orig:
-                    curr_node.wins += LOSE_SCORE + loff
+                    curr_node.wins += LOSE_SCORE
                 else:
-                    curr_node.wins += WIN_SCORE + woff
+                    curr_node.wins += WIN_SCORE
 
             # draws do not depend on team
             if result is OUTCOME_DRAW:
-                curr_node.wins += DRAW_SCORE + doff
-
-            # clear offsets
-            woff = loff = doff = 0
+                curr_node.wins += DRAW_SCORE
 
             # backtrack
             curr_node = parent(curr_node)
 
     @staticmethod
-    def _UCT(node, explore_constant):
+    def _backpropagate_amaf(leaf, result, played, path=None):
+        """ RAVE: updates the all-moves-as-first statistics of
+            every node in path from leaf node to root. A node's
+            'amaf' scores each move its player to move made at
+            any point after it (down the path, then in the
+            playout 'played'), as if it had been played first.
+
+            * 'result' is the outcome for the player to move at
+              the leaf. *
+        """
+
+        # prepare variables
+        team_orig = leaf.player.opponent.play_index
+        orig_score = WIN_SCORE if result == OUTCOME_WIN else LOSE_SCORE if result == OUTCOME_LOSE else DRAW_SCORE
+        opp_score = WIN_SCORE + LOSE_SCORE - orig_score
+        nodes = reversed(path) if path is not None else None
+        curr_node = leaf if nodes is None else next(nodes)
+
+        # moves made after the current node, per play index of whoever made them first
+        after = (None, set(), set())
+        mover = team_orig
+        for mv in played:
+            if mv not in after[1] and mv not in after[2]:
+                after[mover].add(mv)
+            mover = 3 - mover
+
+        # backpropagate:
+        while curr_node is not None:
+            team = curr_node.player.opponent.play_index # player to move at the node
+            score = orig_score if team == team_orig else opp_score
+            amaf = curr_node.amaf
+            if amaf is None:
+                amaf = curr_node.amaf = {}
+            for mv in after[team]:
+                stats = amaf.get(mv)
+                if stats is None:
+                    amaf[mv] = [score, 1]
+                else:
+                    stats[0] += score
+                    stats[1] += 1
+
+            # backtrack (the move into the node came before all of them)
+            parent = curr_node.p if nodes is None else next(nodes, None)
+            if parent is not None:
+                move = curr_node.move
+                if nodes is not None: # (shared nodes are reached by a different move from each parent)
+                    move = next((mv for child, mv in zip(parent.c, parent.cm) if child is curr_node), move)
+                move = tuple(move)
+                who = curr_node.player.play_index
+                after[3 - who].discard(move)
+                after[who].add(move)
+            curr_node = parent
+
+    @staticmethod
+    def _prove(leaf, result, path=None):
+        """ MCTS-Solver: marks 'leaf' as proven ('result' is
+            its final outcome for the player to move there),
+            then proves every node above it that now is, up
+            the path (root to leaf) if given, otherwise up the
+            parent pointers. Stops at the first node that is
+            still open (or was already proven).
+        """
+
+        leaf.proven = FLIP[result]
+        if path is None:
+            node = leaf.p
+        else:
+            nodes = reversed(path)
+            next(nodes) # the leaf
+            node = next(nodes, None)
+
+        while node is not None and not node.proven:
+            value = MonteCarloTree._solved(node)
+            if value == OUTCOME_NONE:
+                return
+            node.proven = value
+            node = node.p if path is None else next(nodes, None)
+
+    @staticmethod
+    def _solved(node):
+        """ Returns the outcome an expanded node is proven to
+            have for its player (OUTCOME_NONE if still open):
+            - lost, if the player to move has a proven win
+            - won, if every move is proven to lose
+            - drawn, if every move is proven and the best draws
+
+            * Untried moves are open (so is a partial compact
+              node, see NodeStore.from_nodes). *
+        """
+
+        moves = node.moves
+        if moves is None: # compact nodes (moves aren't kept)
+            untried = isinstance(node, NodeView) and node.partial
+        else:
+            untried = len(moves) > node.amount()
+        value = OUTCOME_NONE if untried else OUTCOME_WIN
+        for child in node.c:
+            proven = child.proven
+            if proven == OUTCOME_WIN:
+                return OUTCOME_LOSE
+            if proven == OUTCOME_NONE:
+                value = OUTCOME_NONE
+            elif proven == OUTCOME_DRAW and value == OUTCOME_WIN:
+                value = OUTCOME_DRAW
+        return value
+
+    @staticmethod
+    def _PUCT(node, prior, explore_constant, sqrt_parent_sims):
+        """ Predictor + Upper Confidence Bounds for Trees:
+            like UCT, but exploration is weighted by the move's
+            prior (from an evaluator).
+
+            * Takes the square root of the parent's visits. *
+            * Unvisited nodes are valued as draws. *
+        """
+
+        s = node.sims + node.vl
+        q = node.wins / s if s else DRAW_SCORE
+        return q + explore_constant * prior * sqrt_parent_sims / (1 + s)
+
+    @staticmethod
+    def _RAVE(node, stats, explore_constant, parent_sims, k):
+        """ UCT with the node's mean blended with its move's
+            AMAF [wins, visits] 'stats' (see UCT.best_rave).
+        """
+
+        s = node.sims + node.vl
+        if s == 0:
+            return math.inf
+        q = node.wins / s
+        if stats is not None:
+            q += math.sqrt(k / (3 * s + k)) * (stats[0] / stats[1] - q)
+        return q + explore_constant * math.sqrt(math.log(parent_sims) / s)
+
+    @staticmethod
+    def _UCT(node, explore_constant, parent_sims=None):
         """ Upper Confidence Bounds for Trees formula.
             Maintains a balance between exploration
             and exploitation.
             
             * Only meant for nodes with a parent! *
+            * Pass the selecting parent's visits when the node
+              may have several parents. *
+            * Virtual losses count as visits that scored nothing. *
         """
 
         w = node.wins
-        s = node.sims
-        N = node.p.sims
+        s = node.sims + node.vl
+        N = node.p.sims if parent_sims is None else parent_sims
         C = explore_constant
 
         ln = lambda x: math.log(x)
@@ -356,4 +1481,4 @@ class MonteCarloTree:
         if s == 0:
             return math.inf
         else:
-            return (w / s) + (C * sqrt(ln(N) / s))
\ No newline at end of file
+            return (w / s) + (C * sqrt(ln(N) / s))
@@ -0,0 +1,318 @@
+# -------------------------------------------------- #
+# Filename:     MoveService.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Asyncio move service: many games at once,
+#               searched in a pool of processes.
+# -------------------------------------------------- #
+
+# Requests and replies are dicts (one JSON line each over a socket):
+#   request:
+#   - game       : 'tictactoe', 'connect4' or 'mnk:W,H,K' (see SelfPlay.make_game)
+#   - board      : the board to move on (an int, see the game's board layout)
+#   - player     : symbol of the player to move, 'X' or 'O' (either may have
+#                  gone first, but it can't have more stones than the other)
+#   - iterations : iteration budget (None for no limit)
+#   - time_limit : search time in ms (None for no limit)
+#   - deadline   : ms the caller is willing to wait (None for no limit);
+#                  the search only gets what is left of it
+#   - seed       : seed of the search (optional)
+#   - id         : anything, echoed back (optional)
+#   reply:
+#   - move   : [x,y] (None if the game is over)
+#   - cached : True if answered without searching
+#   - ms     : time taken to answer
+#   or, if the request was not answered:
+#   - error  : 'busy' (too many searches running), 'deadline' (ran
+#              out of time) or why the request is invalid
+
+# imports
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from MCTSPlayer import MCTSPlayer
+from SelfPlay import make_game
+
+# constants
+DEFAULT_TIME = 1000 # ms searched when a request sets no budget at all
+MARGIN = 20         # ms of a deadline kept for getting the reply back
+SYMBOLS = ('X', 'O')
+
+# macros
+now = lambda: time.perf_counter() * 1000 # in milliseconds
+
+# functions
+def search_move(spec, board, symbol, iterations, time_limit, seed=None):
+    """ Searches the best move for 'symbol' (to move) on
+        'board' of game 'spec' and returns it as a list [x,y]
+        (None if the game is over). Runs in a worker process.
+    """
+
+    player = MCTSPlayer(time_limit=time_limit, iterations=iterations, seed=seed, verbose=False, reuse_tree=False)
+    other = MCTSPlayer(verbose=False)
+    game = make_game(spec, player, other, seed)
+    player.symbol = symbol
+    other.symbol = SYMBOLS[1 - SYMBOLS.index(symbol)]
+    game.board = board
+    game.go_first = 1 if game._stones(board) % 2 == 0 else 2
+
+    if game.is_terminal(board) or not game.legal_moves(board):
+        return None
+    move = player.go(game)
+    return None if move is None else list(move)
+
+def check_request(spec, board, symbol):
+    """ Raises a ValueError if 'board' is not a position of
+        game 'spec' (see Game.validate) with 'symbol' to move.
+        Runs in-process, before a search is admitted.
+    """
+
+    player = MCTSPlayer(verbose=False)
+    other = MCTSPlayer(verbose=False)
+    game = make_game(spec, player, other, None)
+    player.symbol = symbol
+    other.symbol = SYMBOLS[1 - SYMBOLS.index(symbol)]
+    game.validate(board)
+
+    mine, theirs = game.masks(board, player)
+    if bin(theirs).count('1') - bin(mine).count('1') not in (0, 1):
+        raise ValueError("'" + symbol + "' can't be the player to move on this board")
+
+async def ask(path, request):
+    """ Sends one request to a service listening on Unix
+        socket 'path' and returns the reply.
+    """
+
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+# class
+class MoveService:
+    """ Move Service!
+
+        This class does the following:
+        - answers move requests (see the top of this file),
+          in-process with 'move' or over a Unix socket with
+          'serve'
+        - searches in a pool of 'workers' processes, so the
+          event loop never blocks on a search
+
+        * Answers are cached per request (game, board, player,
+          budget and seed), up to 'cache_size' of them (least
+          recently used go first). *
+        * Identical requests arriving while one is being
+          searched share that search. *
+        * Requests are checked in-process (see check_request)
+          before they may take a search's place. *
+        * Admission control: at most 'pending' searches (2 per
+          worker by default) run or wait at once; requests
+          past that are turned away as 'busy' straight away,
+          so latency stays flat as load grows instead of
+          queueing up. *
+        * A request's deadline caps its search's time limit
+          (less MARGIN); if it still can't be met, the reply
+          is a 'deadline' error. *
+    """
+
+    def __init__(self, workers=1, pending=None, cache_size=4096):
+        """ Initializes the service (the pool starts with the
+            first search).
+        """
+
+        self.workers = workers
+        self.pending = pending or 2 * workers
+        self.cache_size = cache_size
+        self.cache = OrderedDict() # request key -> move
+        self.running = {} # request key -> future of its search
+        self.counts = dict.fromkeys(('requests', 'hits', 'coalesced', 'searches', 'busy', 'deadline', 'errors'), 0)
+        self._pool = None
+
+    def close(self):
+        """ Shuts the worker processes down.
+        """
+
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def move(self, request):
+        """ Answers a single request (see the top of this file)
+            and returns the reply.
+        """
+
+        start = now()
+        self.counts['requests'] += 1
+        reply = await self._answer(request, start)
+        if 'id' in request:
+            reply['id'] = request['id']
+        if 'error' in reply:
+            self.counts[reply['error'] if reply['error'] in self.counts else 'errors'] += 1
+        else:
+            reply['ms'] = round(now() - start, 3)
+        return reply
+
+    async def _answer(self, request, start):
+        """ Returns the reply to a request, without its
+            timing or id.
+        """
+
+        # read the request
+        try:
+            spec = str(request.get('game', 'tictactoe'))
+            board = int(request['board'])
+            symbol = request['player']
+            iterations = request.get('iterations')
+            time_limit = request.get('time_limit')
+            deadline = request.get('deadline')
+            seed = request.get('seed')
+        except (KeyError, TypeError, ValueError) as e:
+            return {'error': 'bad request: ' + str(e)}
+        if symbol not in SYMBOLS:
+            return {'error': "bad request: 'player' must be X or O"}
+        if iterations is None and time_limit is None and deadline is None:
+            time_limit = DEFAULT_TIME
+
+        # cached answers
+        key = (spec, board, symbol, iterations, time_limit, seed)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counts['hits'] += 1
+            return {'move': self.cache[key], 'cached': True}
+
+        # share a search already running, or start one
+        search = self.running.get(key)
+        if search is not None:
+            self.counts['coalesced'] += 1
+        else:
+            try:
+                check_request(spec, board, symbol)
+            except ValueError as e:
+                return {'error': 'bad request: ' + str(e)}
+            if len(self.running) >= self.pending:
+                return {'error': 'busy'}
+            limit = time_limit
+            if deadline is not None:
+                left = deadline - MARGIN - (now() - start)
+                if left <= 0:
+                    return {'error': 'deadline'}
+                limit = left if limit is None else min(limit, left)
+            search = self._search(key, spec, board, symbol, iterations, limit, seed, limit == time_limit)
+
+        # wait (no longer than the deadline)
+        try:
+            if deadline is None:
+                move = await asyncio.shield(search)
+            else:
+                move = await asyncio.wait_for(asyncio.shield(search), max(deadline - (now() - start), 0) / 1000)
+        except asyncio.TimeoutError:
+            return {'error': 'deadline'}
+        except ValueError as e:
+            return {'error': 'bad request: ' + str(e)}
+        except Exception as e: # the search itself failed
+            return {'error': 'search failed: ' + repr(e)}
+        return {'move': move, 'cached': False}
+
+    def _search(self, key, spec, board, symbol, iterations, time_limit, seed, keep=True):
+        """ Starts a search in the pool and returns its future.
+            Its answer is cached once it is done, if 'keep' (not
+            when a deadline cut its time short).
+        """
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        loop = asyncio.get_running_loop()
+        search = loop.run_in_executor(self._pool, search_move, spec, board, symbol, iterations, time_limit, seed)
+        self.running[key] = search
+        self.counts['searches'] += 1
+
+        def done(future):
+            del self.running[key]
+            if not keep or future.cancelled() or future.exception() is not None:
+                return
+            self.cache[key] = future.result()
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        search.add_done_callback(done)
+        return search
+
+    async def serve(self, path):
+        """ Listens on Unix socket 'path' and returns the
+            server. Each connection may send any number of
+            requests, one JSON line each; they are answered
+            concurrently, so replies can come back out of
+            order (match them by 'id').
+        """
+
+        async def handle(reader, writer):
+            lock = asyncio.Lock()
+            tasks = set()
+
+            async def reply(line):
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if isinstance(request, dict):
+                    answer = await self.move(request)
+                else:
+                    answer = {'error': 'bad request: not a JSON object'}
+                async with lock:
+                    writer.write(json.dumps(answer).encode() + b'\n')
+                    await writer.drain()
+
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    task = asyncio.ensure_future(reply(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.wait(tasks)
+            finally:
+                writer.close()
+
+        return await asyncio.start_unix_server(handle, path)
+
+# serve from the command line
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Serve mcts moves over a Unix socket.')
+    parser.add_argument('--socket', default='mcts.sock', help='path of the Unix socket')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--pending', type=int, default=None, help='searches allowed at once (2 per worker by default)')
+    parser.add_argument('--cache', type=int, default=4096, help='answers kept in the cache')
+    args = parser.parse_args(argv)
+
+    async def run():
+        service = MoveService(args.workers, args.pending, args.cache)
+        server = await service.serve(args.socket)
+        print('Serving moves on ' + args.socket, file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+# if this is file running, run the following
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+# -------------------------------------------------- #
+# Filename:     NodeStore.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Compact (struct-of-arrays) storage for
+#               Monte Carlo nodes.
+# -------------------------------------------------- #
+
+# imports
+import sys
+import math
+import mmap
+import struct
+from array import array
+import UCT
+from MonteCarloNode import MonteCarloNode
+
+# constants
+NONE = -1 # "no node" / "no move" index
+MAGIC = b'MCTS' # tree file signature
+VERSION = 3 # version 1 files (without 'proven') and 2 (without 'partial') still load
+HEADER = struct.Struct('<4sIIIIxxxx') # magic, version, nodes, bytes per state, flags
+CONTIGUOUS = 1 # flag: every node's children are next to each other
+# arrays in a tree file, in order (the states follow them)
+SECTIONS = (
+    ('wins', 'd'),
+    ('sims', 'q'),
+    ('parent', 'i'),
+    ('first', 'i'),
+    ('last', 'i'),
+    ('next', 'i'),
+    ('move', 'i'),
+    ('mover', 'b'),
+    ('proven', 'b'),
+    ('partial', 'b')
+)
+# sections in files of each older version
+OLD_SECTIONS = {1: SECTIONS[:-2], 2: SECTIONS[:-1]}
+
+# macros
+pack = lambda mv: NONE if mv is None else mv[0] | (mv[1] << 16) # [x,y] -> int
+unpack = lambda v: None if v == NONE else [v & 0xFFFF, v >> 16] # int -> [x,y]
+
+# functions
+def from_nodes(root):
+    """ Copies the tree of MonteCarloNodes under 'root' into
+        a new store (breadth first, so siblings stay together)
+        and returns the store.
+
+        * A node shared through a transposition table is only
+          kept under the first parent reaching it. *
+        * A node with untried moves (or children kept under
+          another parent) keeps the children it has and is
+          flagged 'partial': a compact search adds the rest
+          of its moves when it next reaches it. *
+    """
+
+    store = NodeStore([root.player, root.player.opponent])
+    seen = {id(root)}
+    queue = [(root, NONE, None)]
+    for node, parent, move in queue:
+        i = store.add(node.player, node.state, parent, move)
+        store.wins[i] = node.wins
+        store.sims[i] = node.sims
+        store.proven[i] = node.proven
+        partial = node.moves is not None and len(node.moves) > node.amount()
+        for child, mv in zip(node.c, node.cm):
+            if id(child) not in seen:
+                seen.add(id(child))
+                queue.append((child, i, mv))
+            else:
+                partial = True
+        store.partial[i] = partial
+    return store
+
+def load(path, players, mapped=False):
+    """ Loads a store saved with NodeStore.save.
+        'players' are the two players of the game.
+
+        * If 'mapped', the file is memory-mapped and the
+          arrays read straight from it (zero-copy, nothing
+          is read until used); such a store is read-only. *
+        * Otherwise the arrays are copied into memory and the
+          store can keep growing (e.g. to warm-start a search). *
+    """
+
+    with open(path, 'rb') as f:
+        if mapped and sys.byteorder == 'little':
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+            mapped = False
+
+    view = memoryview(data)
+    magic, version, count, width, flags = HEADER.unpack_from(view)
+    if magic != MAGIC or (version != VERSION and version not in OLD_SECTIONS):
+        raise ValueError('Not a tree file: ' + str(path))
+
+    store = NodeStore(players)
+    sections = OLD_SECTIONS.get(version, SECTIONS)
+    offset = HEADER.size
+    for name, code in sections:
+        size = count * array(code).itemsize
+        section = view[offset:offset + size]
+        if mapped:
+            setattr(store, name, section.cast(code))
+        else:
+            values = array(code, section.tobytes())
+            if sys.byteorder != 'little':
+                values.byteswap()
+            setattr(store, name, values)
+        offset += size
+    if version == 1: # nothing proven yet
+        store.proven = array('b', bytes(count))
+    if version <= 2: # every node fully expanded
+        store.partial = array('b', bytes(count))
+
+    # states (ints wider than 8 bytes can't be viewed in place)
+    section = view[offset:offset + count * width]
+    if width == 8 and mapped:
+        store.state = section.cast('q')
+    elif width == 8:
+        store.state = array('q', section.tobytes())
+        if sys.byteorder != 'little':
+            store.state.byteswap()
+    else:
+        store.state = [int.from_bytes(section[i:i + width], 'little') for i in range(0, count * width, width)]
+
+    store.contiguous = bool(flags & CONTIGUOUS)
+    store.mapped = mapped
+    store._data = data if mapped else None
+    return store
+
+# classes
+class NodeStore:
+    """ Node Store!
+
+        This class does the following:
+        - stores every node of a tree in parallel arrays
+          (one entry per node, nodes are indices)
+        - hands out MonteCarloNode-like views of its nodes
+
+        * children form a linked list (first child, next
+          sibling), so a node has exactly one parent: a store
+          can't be used with a transposition table *
+        * a node's children are normally added together, so
+          they sit next to each other in the arrays; while
+          that holds ('contiguous'), big families of children
+          are scored with one vectorized pass *
+    """
+
+    def __init__(self, players):
+        """ Initializes an empty store.
+            'players' are the two players of the game.
+        """
+
+        self.players = {p.play_index: p for p in players}
+        self.wins   = array('d') # number of times this player won in simulations
+        self.sims   = array('q') # number of times this player has played simulations
+        self.parent = array('i') # index of the parent node
+        self.first  = array('i') # index of the first child
+        self.last   = array('i') # index of the last child
+        self.next   = array('i') # index of the next sibling
+        self.move   = array('i') # packed move that led to the node
+        self.mover  = array('b') # play index of the player who just made a move
+        self.proven = array('b') # proven outcome for that player (0 while unknown)
+        self.partial = array('b') # 1 if the node has moves left to add to its children
+        self.state  = array('q') # board (bitboard int) after the move
+        self.contiguous = True # every node's children are next to each other
+        self.mapped = False # arrays read straight from a memory-mapped file (read-only)
+        self._data = None # the mapped file, if any
+
+    def __len__(self):
+        """ Number of nodes.
+        """
+
+        return len(self.wins)
+
+    def add(self, player, state, parent=NONE, move=None):
+        """ Appends a node (as the last child of 'parent')
+            and returns its index.
+        """
+
+        i = len(self.wins)
+        self.wins.append(0.0)
+        self.sims.append(0)
+        self.parent.append(parent)
+        self.first.append(NONE)
+        self.last.append(NONE)
+        self.next.append(NONE)
+        self.move.append(pack(move))
+        self.mover.append(player.play_index)
+        self.proven.append(0)
+        self.partial.append(0)
+        try:
+            self.state.append(state)
+        except OverflowError: # board too big for a 64-bit int
+            self.state = list(self.state)
+            self.state.append(state)
+
+        if parent != NONE:
+            if self.first[parent] == NONE:
+                self.first[parent] = i
+            else:
+                if self.last[parent] != i - 1:
+                    self.contiguous = False
+                self.next[self.last[parent]] = i
+            self.last[parent] = i
+
+        return i
+
+    def save(self, path):
+        """ Writes the store as: header, then every array of
+            SECTIONS packed back to back (little-endian), then
+            the states, each in the same number of bytes.
+        """
+
+        if isinstance(self.state, list): # boards too big for 64-bit ints
+            width = max((s.bit_length() + 7) // 8 for s in self.state)
+        else:
+            width = 8
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self), width, CONTIGUOUS if self.contiguous else 0))
+            for name, code in SECTIONS:
+                values = array(code, getattr(self, name))
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(f)
+            if width == 8:
+                states = array('q', self.state)
+                if sys.byteorder != 'little':
+                    states.byteswap()
+                states.tofile(f)
+            else:
+                f.write(b''.join(s.to_bytes(width, 'little') for s in self.state))
+
+    def children(self, i):
+        """ Returns the indices of a node's children.
+        """
+
+        out = []
+        child = self.first[i]
+        while child != NONE:
+            out.append(child)
+            child = self.next[child]
+        return out
+
+    def view(self, i):
+        """ Returns a MonteCarloNode-like view of a node.
+        """
+
+        return NodeView(self, i)
+
+    def subtree(self, i):
+        """ Copies the sub-tree under node 'i' into a new store
+            and returns the view of its root (with no parent).
+        """
+
+        store = NodeStore(self.players.values())
+        queue = [(i, NONE)] # breadth first, so siblings stay together
+        for old, parent in queue:
+            new = store.add(self.players[self.mover[old]], self.state[old], parent, unpack(self.move[old]))
+            store.wins[new] = self.wins[old]
+            store.sims[new] = self.sims[old]
+            store.proven[new] = self.proven[old]
+            store.partial[new] = self.partial[old]
+            queue.extend((child, new) for child in self.children(old))
+        return store.view(0)
+
+    def best_child(self, i, C):
+        """ Returns the index of the maximum-UCT scoring child
+            of node 'i' (None if it has no unproven children),
+            reading the statistics straight from the arrays.
+
+            * Children next to each other are scored in one
+              vectorized pass when there are enough of them. *
+        """
+
+        first = self.first[i]
+        if first == NONE:
+            return None
+
+        wins = self.wins
+        sims = self.sims
+        proven = self.proven
+
+        # vectorized (straight from the arrays' memory)
+        end = self.last[i] + 1
+        if self.contiguous and UCT.available and end - first >= UCT.VECTOR_MIN:
+            w = UCT.np.frombuffer(wins, dtype=UCT.np.float64)[first:end]
+            s = UCT.np.frombuffer(sims, dtype=UCT.np.int64)[first:end]
+            p = UCT.np.frombuffer(proven, dtype=UCT.np.int8)[first:end]
+            best = UCT.best_index(w, s, sims[i], C, p)
+            return None if best is None else first + best
+
+        # one child at a time
+        explore = C * UCT.sqrt_ln(sims[i])
+        recip = UCT.RECIP
+        rsqrt = UCT.RSQRT
+        nxt = self.next
+
+        best = None
+        best_pts = -math.inf
+        child = first
+        while child != NONE:
+            if proven[child]:
+                child = nxt[child]
+                continue
+            s = sims[child]
+            if s == 0:
+                return child
+            if s < UCT.TABLE_SIZE:
+                pts = wins[child] * recip[s] + explore * rsqrt[s]
+            else:
+                pts = wins[child] / s + explore / math.sqrt(s)
+            if best_pts < pts:
+                best_pts = pts
+                best = child
+            child = nxt[child]
+
+        return best
+
+class NodeView:
+    """ Node View!
+
+        This class does the following:
+        - behaves like a MonteCarloNode backed by a NodeStore
+
+        * views are created on demand, so compare them with
+          '==' rather than 'is' *
+    """
+
+    __slots__ = ('s', 'i')
+
+    def __init__(self, store, index):
+        """ Initializes a view of node 'index' in 'store'.
+        """
+
+        self.s = store
+        self.i = index
+
+    def __eq__(self, other):
+        """ Views are equal if they view the same node.
+        """
+
+        return isinstance(other, NodeView) and self.s is other.s and self.i == other.i
+
+    def __hash__(self):
+        """ Hashes by store and index.
+        """
+
+        return hash((id(self.s), self.i))
+
+    @property
+    def wins(self):
+        return self.s.wins[self.i]
+
+    @wins.setter
+    def wins(self, value):
+        self.s.wins[self.i] = value
+
+    @property
+    def sims(self):
+        return self.s.sims[self.i]
+
+    @sims.setter
+    def sims(self, value):
+        self.s.sims[self.i] = value
+
+    @property
+    def p(self):
+        parent = self.s.parent[self.i]
+        return None if parent == NONE else NodeView(self.s, parent)
+
+    @p.setter
+    def p(self, node):
+        self.s.parent[self.i] = NONE if node is None else node.i
+
+    @property
+    def c(self):
+        return [NodeView(self.s, child) for child in self.s.children(self.i)]
+
+    @property
+    def cm(self):
+        return [unpack(self.s.move[child]) for child in self.s.children(self.i)]
+
+    @property
+    def move(self):
+        return unpack(self.s.move[self.i])
+
+    @property
+    def state(self):
+        return self.s.state[self.i]
+
+    @property
+    def player(self):
+        return self.s.players[self.s.mover[self.i]]
+
+    @property
+    def proven(self):
+        return self.s.proven[self.i]
+
+    @proven.setter
+    def proven(self, value):
+        self.s.proven[self.i] = value
+
+    @property
+    def partial(self):
+        return self.s.partial[self.i]
+
+    @partial.setter
+    def partial(self, value):
+        self.s.partial[self.i] = value
+
+    @property
+    def final(self):
+        return None # compact trees keep no per-node caches
+
+    @final.setter
+    def final(self, value):
+        pass
+
+    @property
+    def moves(self):
+        return None
+
+    @moves.setter
+    def moves(self, value):
+        pass
+
+    @property
+    def cp(self):
+        return None # compact trees are never searched with an evaluator
+
+    @property
+    def vl(self):
+        return 0 # compact trees are never searched by several threads
+
+    def _to_str(self, detailed=False, prefix="", describe=None, curr=None):
+        """ Returns self's sub-tree in the form of a string
+        """
+
+        return MonteCarloNode._to_str(self, detailed, prefix, describe, curr)
+
+    def amount(self):
+        """ Number of children.
+        """
+
+        return 0 if self.s.first[self.i] == NONE else len(self.s.children(self.i))
+
+    def link(self, child, move):
+        """ Not supported: a stored node has a single parent.
+        """
+
+        raise ValueError('A NodeStore node can only have one parent (no transposition tables).')
+
+    def make_leaf(self, move, state):
+        """ Creates a leaf node given a move and
+            the board after that move was applied.
+            Also returns the created node.
+        """
+
+        player = self.player.opponent
+        return NodeView(self.s, self.s.add(player, state, self.i, move))
@@ -0,0 +1,135 @@
+# -------------------------------------------------- #
+# Filename:     PositionCache.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Cache of search results per position,
+#               shared across MCTSPlayer moves.
+# -------------------------------------------------- #
+
+# imports
+from collections import OrderedDict
+
+# class
+class PositionCache:
+    """ Position Cache!
+
+        This class does the following:
+        - keeps the root statistics (move -> (wins, sims)) and
+          best move of searched positions, keyed by canonical
+          position and player to move
+        - evicts the least recently used entries when full
+
+        * 'capacity' bounds the number of moves stored across
+          all entries (an entry weighs 1 + its number of moves),
+          so big positions take up more of the cache *
+        * an entry searched with at least 'min_sims' playouts
+          is confident: its move is used as is; otherwise it
+          only warm-starts a new search (see MCTSPlayer) *
+        * symmetric copies of a stored position share its entry
+          (moves are mapped through the symmetry between them,
+          see Game.symmetry), so use one cache per kind of
+          game *
+    """
+
+    def __init__(self, capacity=1 << 16, min_sims=1000):
+        """ Initializes the cache.
+            A capacity of None means unbounded.
+        """
+
+        self.capacity = capacity
+        self.min_sims = min_sims
+        self.entries = OrderedDict() # key -> (board, stats, best move, sims) (oldest first)
+        self.weight = 0 # moves stored (plus one per entry)
+        self.hits = 0 # confident answers
+        self.warm = 0 # answers only good to warm-start from
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """ Number of stored positions.
+        """
+
+        return len(self.entries)
+
+    def key(self, game, board):
+        """ Returns the cache key of a position.
+        """
+
+        return (game.canonical(board), game.to_move(board).symbol)
+
+    def get(self, game, board):
+        """ Returns (stats, best move, confident) stored for the
+            position (and marks it as recently used), or None.
+
+            * Stats and move are for 'board' itself, even if
+              they were stored for a symmetric copy of it. *
+        """
+
+        key = self.key(game, board)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+
+        stored, stats, best, sims = entry
+        if stored != board:
+            moved = self._translate(game, stored, stats, best, board)
+            if moved is None:
+                self.misses += 1
+                return None
+            stats, best = moved
+
+        confident = sims >= self.min_sims and best is not None
+        if confident:
+            self.hits += 1
+        else:
+            self.warm += 1
+        return stats, best, confident
+
+    def put(self, game, board, stats, best):
+        """ Stores the root statistics and best move of a search
+            on 'board', unless the entry already stored was
+            searched more.
+        """
+
+        key = self.key(game, board)
+        sims = sum(s for _, s in stats.values())
+        old = self.entries.get(key)
+        if old is not None:
+            if old[3] > sims:
+                self.entries.move_to_end(key)
+                return
+            self.weight -= 1 + len(old[1])
+
+        self.entries[key] = (board, dict(stats), best, sims)
+        self.entries.move_to_end(key)
+        self.weight += 1 + len(stats)
+
+        if self.capacity is not None:
+            while self.weight > self.capacity and len(self.entries) > 1:
+                _, (_, evicted, _, _) = self.entries.popitem(last=False)
+                self.weight -= 1 + len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """ Removes every entry.
+        """
+
+        self.entries.clear()
+        self.weight = 0
+
+    def _translate(self, game, stored, stats, best, board):
+        """ Maps the stats and best move of position 'stored'
+            onto its symmetric copy 'board' (or returns None if
+            the game finds no symmetry between them).
+
+            * Moves are mapped one by one, so mirror-image moves
+              of a symmetric position keep their own stats. *
+        """
+
+        move = game.symmetry(stored, board)
+        if move is None:
+            return None
+        moved = {tuple(move(list(mv))): ws for mv, ws in stats.items()}
+        return moved, None if best is None else move(best)
@@ -0,0 +1,144 @@
+# -------------------------------------------------- #
+# Filename:     SearchStats.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Per-phase counters, timers and tree
+#               shape statistics of an mcts search.
+# -------------------------------------------------- #
+
+# A hook is called as hook(event, info), where info is a dict:
+#   - 'expand'    : {depth, children}   a leaf was expanded
+#   - 'iteration' : {depth, terminal}   an iteration ended at a leaf
+#                                       'depth' moves below the root
+#   - 'progress'  : {iterations}        iterations of this search so
+#                                       far (every "Thinking..." tick)
+
+# imports
+import time
+
+# constants
+PHASES = ('select', 'expand', 'simulate', 'backprop')
+
+# macros
+clock = time.perf_counter # in seconds
+
+# class
+class SearchStats:
+    """ Search Statistics!
+
+        Filled in by a search when asked for (see
+        MonteCarloTree.search's 'stats'), and kept on the
+        tree as 'stats':
+        - counts : phase -> times the phase ran
+        - times  : phase -> seconds spent in the phase
+        - depths : depth -> iterations that ended that deep
+        - expansions, children, max_children : branching
+        - terminal : iterations that ended on a final state
+
+        * Searching on with the same tree adds to the same
+          statistics. *
+    """
+
+    def __init__(self, hook=None):
+        """ Initializes empty statistics.
+        """
+
+        self.hook = hook # called on every event (see the top of this file)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.depths = []
+        self.iterations = 0
+        self.terminal = 0
+        self.expansions = 0
+        self.children = 0
+        self.max_children = 0
+
+    def __str__(self):
+        """ Replaces default print behavior by printing a
+            short report.
+        """
+
+        s = 'Search Stats: {} iterations ({} terminal)\n'.format(self.iterations, self.terminal)
+        total = sum(self.times.values()) or 1
+        for phase in PHASES:
+            s += '    {:<9}{:>9} x {:>10.1f} ms ({:.0%})\n'.format(
+                phase, self.counts[phase], self.times[phase] * 1000, self.times[phase] / total)
+        s += '    depth    mean {:.2f}, max {}\n'.format(self.mean_depth(), max(len(self.depths) - 1, 0))
+        s += '    branch   mean {:.2f}, max {}\n'.format(self.mean_branching(), self.max_children)
+        return s
+
+    def lap(self, phase, since):
+        """ Adds the time from 'since' until now to 'phase'
+            and returns now (the start of the next phase).
+        """
+
+        stamp = clock()
+        self.counts[phase] += 1
+        self.times[phase] += stamp - since
+        return stamp
+
+    def expanded(self, depth, children):
+        """ Records the expansion of a leaf 'depth' moves
+            below the root into 'children' children.
+        """
+
+        self.expansions += 1
+        self.children += children
+        if self.max_children < children:
+            self.max_children = children
+        if self.hook is not None:
+            self.hook('expand', {'depth': depth, 'children': children})
+
+    def ended(self, depth, terminal=False):
+        """ Records an iteration that ended 'depth' moves below
+            the root (on a final state if 'terminal').
+        """
+
+        depths = self.depths
+        while len(depths) <= depth:
+            depths.append(0)
+        depths[depth] += 1
+        self.iterations += 1
+        if terminal:
+            self.terminal += 1
+        if self.hook is not None:
+            self.hook('iteration', {'depth': depth, 'terminal': terminal})
+
+    def progress(self, iterations):
+        """ Reports how many iterations the search has done.
+        """
+
+        if self.hook is not None:
+            self.hook('progress', {'iterations': iterations})
+
+    def mean_depth(self):
+        """ Average depth iterations ended at.
+        """
+
+        if not self.iterations:
+            return 0.0
+        return sum(d * n for d, n in enumerate(self.depths)) / self.iterations
+
+    def mean_branching(self):
+        """ Average number of children per expanded leaf.
+        """
+
+        if not self.expansions:
+            return 0.0
+        return self.children / self.expansions
+
+    def summary(self):
+        """ Returns the statistics as a plain dict.
+        """
+
+        return {
+            'iterations': self.iterations,
+            'terminal': self.terminal,
+            'counts': dict(self.counts),
+            'times': dict(self.times),
+            'depths': list(self.depths),
+            'mean_depth': self.mean_depth(),
+            'expansions': self.expansions,
+            'mean_branching': self.mean_branching(),
+            'max_children': self.max_children
+        }
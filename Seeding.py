@@ -0,0 +1,28 @@
+# -------------------------------------------------- #
+# Filename:     Seeding.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Helpers for seedable random streams.
+# -------------------------------------------------- #
+
+# imports
+import random
+
+# functions
+def make_rng(seed=None):
+    """ Returns a random.Random for 'seed', which may be an
+        int (or any hashable seed), an existing random.Random
+        (returned as is) or None (seeded from the OS).
+    """
+
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+def derive(rng, count):
+    """ Returns 'count' seeds drawn from 'rng', used to give
+        parallel workers their own independent (but
+        reproducible) random streams.
+    """
+
+    return [rng.getrandbits(64) for _ in range(count)]
@@ -0,0 +1,180 @@
+# -------------------------------------------------- #
+# Filename:     SelfPlay.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Headless MCTS self-play, streamed as
+#               records from a pool of processes.
+# -------------------------------------------------- #
+
+# Every game is played by two player configurations, 'a' and 'b'
+# (MCTSPlayer keyword arguments), which swap seats every game. One
+# record (a dict, one JSON line) is produced per game:
+#   - game   : index of the game
+#   - seed   : seed the game was played with
+#   - seats  : config ('a' or 'b') of player 1 and of player 2
+#   - first  : play index of the player who went first
+#   - moves  : [{config, symbol, move, visits}], where visits is a
+#              list of [move, visits, wins] for every root child
+#              (empty for book moves)
+#   - winner : config that won ('a' or 'b'), None for a draw
+#   - turns  : number of moves played
+
+# imports
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from MCTSPlayer import MCTSPlayer
+from TicTacToe import TicTacToe
+from MNKGame import MNKGame
+from ConnectFour import ConnectFour
+from Seeding import make_rng, derive
+
+# functions
+def make_game(spec, p1, p2, seed):
+    """ Returns a new game for 'spec': 'tictactoe',
+        'connect4' or 'mnk:W,H,K' (e.g. 'mnk:15,15,5').
+    """
+
+    if spec == 'tictactoe':
+        return TicTacToe(p1, p2, seed)
+    if spec == 'connect4':
+        return ConnectFour(p1, p2, seed=seed)
+    if spec.startswith('mnk:'):
+        width, height, k = (int(v) for v in spec[4:].split(','))
+        return MNKGame(p1, p2, width, height, k, seed)
+    raise ValueError('Unknown game: ' + str(spec))
+
+def play_one(index, seed, spec, a, b):
+    """ Plays one quiet game between configurations 'a' and
+        'b' (seats swap on odd games) and returns its record.
+    """
+
+    rng = make_rng(seed)
+    seats = ('b', 'a') if index % 2 else ('a', 'b')
+    configs = {'a': a, 'b': b}
+    players = [MCTSPlayer(**dict(configs[name], seed=rng.getrandbits(64), verbose=False)) for name in seats]
+    game = make_game(spec, players[0], players[1], rng.getrandbits(64))
+
+    moves = []
+    def record(player, move):
+        stats = player.last_stats or {}
+        moves.append({
+            'config': seats[player.play_index - 1],
+            'symbol': player.symbol,
+            'move': list(move),
+            'visits': [[list(mv), sims, wins] for mv, (wins, sims) in stats.items()]
+        })
+
+    try:
+        game.start(quiet=True, on_move=record)
+    finally:
+        for player in players:
+            player.close()
+
+    return {
+        'game': index,
+        'seed': seed,
+        'seats': list(seats),
+        'first': game.go_first,
+        'moves': moves,
+        'winner': None if game.winner is None else seats[game.winner.play_index - 1],
+        'turns': len(moves)
+    }
+
+def play_games(games, a, b, spec='tictactoe', workers=1, seed=None, pending=None):
+    """ Generator:
+        Plays 'games' self-play games between configurations
+        'a' and 'b' and yields each game's record as soon as
+        it finishes (in completion order, see 'game').
+
+        * With 'workers' above 1, games run in a process pool.
+          At most 'pending' games (2 per worker by default) are
+          running or waiting to be consumed at once, so a slow
+          consumer slows the pool down instead of piling up
+          results in memory. *
+        * Player configurations should search with workers=1
+          (threads are fine): the pool already fills the cores. *
+    """
+
+    seeds = derive(make_rng(seed), games)
+
+    # one process
+    if workers <= 1:
+        for index, game_seed in enumerate(seeds):
+            yield play_one(index, game_seed, spec, a, b)
+        return
+
+    # process pool (with back-pressure)
+    limit = pending or 2 * workers
+    todo = enumerate(seeds)
+    running = set()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(running) < limit:
+                task = next(todo, None)
+                if task is None:
+                    break
+                running.add(pool.submit(play_one, task[0], task[1], spec, a, b))
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def write_jsonl(records, out):
+    """ Writes records as JSON lines to 'out' (a path or a
+        text file) while pulling them one at a time, and
+        returns how many there were.
+    """
+
+    if isinstance(out, str):
+        with open(out, 'w') as f:
+            return write_jsonl(records, f)
+
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, separators=(',', ':')) + '\n')
+        count += 1
+    return count
+
+def tally(records, totals):
+    """ Generator:
+        Passes records through, counting the winners into
+        'totals' (a dict of: 'a' / 'b' / 'draw' -> games).
+    """
+
+    for record in records:
+        key = record['winner'] or 'draw'
+        totals[key] = totals.get(key, 0) + 1
+        yield record
+
+# self-play from the command line
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Stream MCTS self-play games to a JSONL file.')
+    parser.add_argument('--out', default='selfplay.jsonl', help="where to write the records ('-' for stdout)")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--game', default='tictactoe', help="'tictactoe', 'connect4' or 'mnk:W,H,K'")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--a', default='{"time_limit": null, "iterations": 200}', help='config a (MCTSPlayer arguments as JSON)')
+    parser.add_argument('--b', default=None, help='config b (same as a if not given)')
+    args = parser.parse_args(argv)
+
+    a = json.loads(args.a)
+    b = json.loads(args.b) if args.b else a
+    totals = {}
+    records = tally(play_games(args.games, a, b, args.game, args.workers, args.seed), totals)
+    count = write_jsonl(records, sys.stdout if args.out == '-' else args.out)
+
+    print('Played {} games: a {} / b {} / draw {}'.format(count, totals.get('a', 0), totals.get('b', 0), totals.get('draw', 0)),
+          file=sys.stderr)
+    return 0
+
+# if this is file running, run the following
+if __name__ == "__main__":
+    sys.exit(main())
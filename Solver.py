@@ -0,0 +1,175 @@
+# -------------------------------------------------- #
+# Filename:     Solver.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Perfect-play TicTacToe solver and
+#               precomputed move book.
+# -------------------------------------------------- #
+
+# Positions are given from the point of view of the player to
+# move: 'mine' and 'theirs' are 9-bit masks (see Bitboard).
+
+# imports
+import sys
+import struct
+from array import array
+import Bitboard
+
+# constants
+MAGIC = b'TTTB' # book file signature
+VERSION = 1
+HEADER = struct.Struct('<4sII') # magic, version, number of positions
+
+# memoized values, keyed by canonical position
+_values = {}
+
+# functions
+def solve(mine, theirs):
+    """ Returns the game value for the player to move
+        (1 : win, 0 : draw, -1 : loss) with perfect play
+        from both sides.
+
+        * Negamax, memoized over positions reduced by the
+          8 board symmetries. *
+    """
+
+    key = Bitboard.canonical(mine, theirs)[0]
+    value = _values.get(key)
+    if value is not None:
+        return value
+
+    if Bitboard.wins(theirs):
+        value = -1
+    elif (mine | theirs) == Bitboard.FULL:
+        value = 0
+    else:
+        value = -1
+        free = ~(mine | theirs) & Bitboard.FULL
+        for i in range(Bitboard.CELLS):
+            if free >> i & 1:
+                value = max(value, -solve(theirs, mine | (1 << i)))
+                if value == 1:
+                    break
+
+    _values[key] = value
+    return value
+
+def best_cells(mine, theirs):
+    """ Returns every cell index that keeps the best game
+        value for the player to move, along with that value.
+    """
+
+    best_value = -2
+    best = []
+    free = ~(mine | theirs) & Bitboard.FULL
+    for i in range(Bitboard.CELLS):
+        if free >> i & 1:
+            value = -solve(theirs, mine | (1 << i))
+            if value > best_value:
+                best_value = value
+                best = []
+            if value == best_value:
+                best.append(i)
+
+    return best, best_value
+
+def build_book():
+    """ Solves every reachable, unfinished position and
+        returns a Book of one perfect move per position
+        (stored once per symmetry class).
+    """
+
+    moves = {}
+    stack = [(0, 0)]
+    while stack:
+        mine, theirs = stack.pop()
+        key = Bitboard.canonical(mine, theirs)[0]
+        if key in moves:
+            continue
+        if Bitboard.wins(theirs) or (mine | theirs) == Bitboard.FULL:
+            continue
+
+        # store the move in the canonical orientation
+        cmine, ctheirs = key & Bitboard.FULL, key >> Bitboard.CELLS
+        moves[key] = best_cells(cmine, ctheirs)[0][0]
+
+        free = ~(mine | theirs) & Bitboard.FULL
+        for i in range(Bitboard.CELLS):
+            if free >> i & 1:
+                stack.append((theirs, mine | (1 << i)))
+
+    return Book(moves)
+
+def load_book(path):
+    """ Loads a Book saved with Book.save.
+    """
+
+    with open(path, 'rb') as f:
+        magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a TicTacToe book file: ' + str(path))
+        keys = array('I')
+        keys.fromfile(f, count)
+        cells = array('B')
+        cells.fromfile(f, count)
+
+    if sys.byteorder != 'little':
+        keys.byteswap()
+
+    return Book(dict(zip(keys, cells)))
+
+# class
+class Book:
+    """ Move Book!
+
+        This class does the following:
+        - maps a position (canonical key) to a perfect move
+        - saves itself to a compact binary file
+    """
+
+    def __init__(self, moves):
+        """ Initializes the book from a dictionary of:
+            canonical key -> cell index (canonical orientation)
+        """
+
+        self.moves = moves
+
+    def __len__(self):
+        """ Number of positions covered.
+        """
+
+        return len(self.moves)
+
+    def lookup(self, mine, theirs):
+        """ Returns the book move [x,y] for the player to move,
+            or None if the position is not covered.
+        """
+
+        key, sym = Bitboard.canonical(mine, theirs)
+        cell = self.moves.get(key)
+        if cell is None:
+            return None
+
+        # map back to the real board orientation
+        return Bitboard.MOVES[Bitboard.INVERSES[sym][cell]]
+
+    def save(self, path):
+        """ Writes the book as: header, keys (uint32), cells (uint8).
+        """
+
+        keys = array('I', sorted(self.moves))
+        cells = array('B', (self.moves[k] for k in keys))
+        if sys.byteorder != 'little':
+            keys.byteswap()
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+            keys.tofile(f)
+            cells.tofile(f)
+
+# build a book file from the command line
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tictactoe.book'
+    book = build_book()
+    book.save(path)
+    print('Saved ' + str(len(book)) + ' positions to ' + path)
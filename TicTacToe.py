@@ -6,14 +6,16 @@
 # -------------------------------------------------- #
 
 # imports
-from random import randint
-from copy import deepcopy as copy
+import Bitboard
+import BatchRollout
+from Game import Game
+from Seeding import make_rng
 
 # macros
-flipcoin = lambda: randint(1, 2)
+flipcoin = lambda rng: rng.randint(1, 2)
 
 # class
-class TicTacToe:
+class TicTacToe(Game):
     """ TicTacToe Game!
 
         This class controls the following:
@@ -21,6 +23,7 @@ class TicTacToe:
         - win/lose/draw events
         - board updating
         - board rendering
+        - the game protocol searched by mcts (see Game)
 
         stores the following:
         - players
@@ -29,8 +32,11 @@ class TicTacToe:
         - game summary
     """
 
-    def __init__(self, p1, p2):
+    def __init__(self, p1, p2, seed=None):
         """ Initializes the game.
+
+            * 'seed' (an int or a random.Random) decides the
+              coin flip for who goes first. *
         """
 
         p1.play_index = 1
@@ -39,14 +45,17 @@ class TicTacToe:
         p2.opponent = p1
         self.p1 = p1
         self.p2 = p2
-        self.board = [
-            ['_', '_', '_'],
-            ['_', '_', '_'],
-            ['_', '_', '_']
-        ]
-        self.go_first = flipcoin()
+        self.board = Bitboard.EMPTY_BOARD
+        self.width = Bitboard.SIZE
+        self.height = Bitboard.SIZE
+        self.rng = make_rng(seed)
+        self.go_first = flipcoin(self.rng)
         self.turns = 0
+        self.winner = None # winning player (None if draw or unfinished)
         self.summary = 'Initialized.'
+        self._free = [0] * Bitboard.CELLS # scratch: empty cells for playouts
+        self._free_n = 0                  # how many cells of _free are empty
+        self._free_of = None              # board _free was filled from
 
     def __str__(self):
         """ Replaces default print behaviour with a summary.
@@ -65,20 +74,29 @@ class TicTacToe:
         if board is None:
             board = self.board
 
-        return board[pt[1]][pt[0]]
+        return Bitboard.symbol_at(board, pt)
 
     def set_at(self, pt, val, board=None):
         """ Sets the value on the board at
-            a point [x,y].
+            a point [x,y] and returns the new board.
             
-            * An alternate board may be passed instead as well. *
+            * An alternate board may be passed instead as well.
+              Boards are ints, so only the game's own board is
+              updated in place; alternate boards are returned. *
         """
 
-        board = board
-        if board is None:
+        own = board is None
+        if own:
             board = self.board
 
-        board[pt[1]][pt[0]] = val
+        board = Bitboard.clear(board, pt)
+        if val != Bitboard.EMPTY_SYMBOL:
+            board = Bitboard.place(board, pt, val)
+
+        if own:
+            self.board = board
+
+        return board
 
     def next(self):
         """ Returns next player based on # of turns and who went 1st.
@@ -128,58 +146,14 @@ class TicTacToe:
         if board is None:
             board = self.board
 
-        # check horizontal wins
-        for row in board:
-            if (row[0] == player.symbol and
-                row[1] == player.symbol and
-                row[2] == player.symbol):
-                return 1
-            if (row[0] == player.opponent.symbol and
-                row[1] == player.opponent.symbol and
-                row[2] == player.opponent.symbol):
-                return 2
-
-        # check vertical wins
-        for col in range(3):
-            if (board[0][col] == player.symbol and
-                board[1][col] == player.symbol and
-                board[2][col] == player.symbol):
-                return 1
-            if (board[0][col] == player.opponent.symbol and
-                board[1][col] == player.opponent.symbol and
-                board[2][col] == player.opponent.symbol):
-                return 2
-
-        # check positive diagonal wins
-        if (board[2][0] == player.symbol and
-            board[1][1] == player.symbol and
-            board[0][2] == player.symbol):
-            return 1
-        if (board[2][0] == player.opponent.symbol and
-            board[1][1] == player.opponent.symbol and
-            board[0][2] == player.opponent.symbol):
-            return 2
-
-        # check negative diagonal wins
-        if (board[0][0] == player.symbol and
-            board[1][1] == player.symbol and
-            board[2][2] == player.symbol):
+        # check wins (a few ANDs against the win masks)
+        if Bitboard.wins(Bitboard.mask_of(board, player.symbol)):
             return 1
-        if (board[0][0] == player.opponent.symbol and
-            board[1][1] == player.opponent.symbol and
-            board[2][2] == player.opponent.symbol):
+        if Bitboard.wins(Bitboard.mask_of(board, player.opponent.symbol)):
             return 2
 
         # check for draw
-        not_draw = False
-        for row in board:
-            if not_draw:
-                break
-            for symbol in row:
-                if symbol is '_':
-                    not_draw = True
-                    break
-        if not_draw is False:
+        if Bitboard.taken(board) == Bitboard.FULL:
             return 3
 
         # no game state change required
@@ -194,27 +168,231 @@ class TicTacToe:
         if board is None:
             board = self.board
 
-        moves = []
+        return Bitboard.empty_moves(board)
+
+    def legal_moves(self, state):
+        """ Game protocol: returns a list of possible moves.
+        """
+
+        return self.moves(state)
+
+    def apply(self, state, move):
+        """ Game protocol: returns the board after the player
+            to move plays 'move'.
+        """
+
+        return self.set_at(move, self.to_move(state).symbol, state)
 
-        for j in range(len(board)):
-            row = board[j]
-            for i in range(len(row)):
-                if row[i] is '_':
-                    moves.append([i,j])
+    def is_terminal(self, state):
+        """ Game protocol: returns True if the game is over.
+        """
+
+        return self.check(self.p1, state) != 0
+
+    def result(self, state, player):
+        """ Game protocol: returns the outcome for 'player'
+            (same values as check).
+        """
+
+        return self.check(player, state)
+
+    def to_move(self, state):
+        """ Game protocol: returns the player whose turn it
+            is, based on the number of stones and who went 1st.
+        """
+
+        first = self.p1 if self.go_first == 1 else self.p2
+        if self._stones(state) % 2 == 0:
+            return first
+        return first.opponent
+
+    def step(self, state, move, moves):
+        """ Game protocol: plays 'move' and returns (new board,
+            outcome for the player to move there, legal moves
+            there), working both out from the move: only a win
+            through the new stone is checked, and the legal
+            moves are the old ones less the one played.
+        """
+
+        player = self.to_move(state)
+        state = self.set_at(move, player.symbol, state)
+        if self._wins_at(self.masks(state, player)[0], move[1] * self.width + move[0]):
+            return state, 2, []
+        moves = self._left(moves, move)
+        return state, 0 if moves else 3, moves
+
+    def _left(self, moves, move):
+        """ Legal moves left once 'move' (one of 'moves') is
+            played.
+        """
 
-        return moves
+        return [mv for mv in moves if mv != move]
+
+    def canonical(self, state):
+        """ Game protocol: returns the board under its smallest
+            rotation / reflection (see Bitboard.canonical).
+        """
+
+        return Bitboard.canonical(Bitboard.mask_of(state, 'X'), Bitboard.mask_of(state, 'O'))[0]
+
+    def symmetry(self, state, other):
+        """ Game protocol: returns a function mapping moves on
+            'state' through the rotation / reflection that turns
+            it into 'other' (see Bitboard.SYMMETRIES), or None.
+        """
+
+        x_mask = Bitboard.mask_of(state, 'X')
+        o_mask = Bitboard.mask_of(state, 'O')
+        target = (Bitboard.mask_of(other, 'X'), Bitboard.mask_of(other, 'O'))
+        for s, perm in enumerate(Bitboard.SYMMETRIES):
+            if (Bitboard.transform(x_mask, s), Bitboard.transform(o_mask, s)) == target:
+                return lambda mv: Bitboard.MOVES[perm[Bitboard.index(mv)]]
+        return None
+
+    def validate(self, state):
+        """ Game protocol: raises a ValueError if 'state' has
+            stones off the board or two stones on one cell.
+        """
+
+        cells = self.width * self.height
+        if state < 0 or state >> (2 * cells):
+            raise ValueError('stones off the board')
+        if state & (state >> cells):
+            raise ValueError('two stones on one cell')
+
+    def describe(self, state):
+        """ Game protocol: returns the board as rows of text.
+        """
+
+        return [str([self.at([x, y], state) for x in range(self.width)]) for y in range(self.height)]
+
+    def _stones(self, state):
+        """ Number of stones on a board.
+        """
+
+        return bin(state).count('1')
+
+    def playout(self, state, player, rng, played=None):
+        """ Game protocol: plays one random game from 'state'
+            with 'player' to move and returns the outcome for
+            'player' (same values as check). Moves made are
+            appended to 'played', if given (see Game.playout).
+
+            * Runs in place: stones are made on two local masks
+              and the empty cells live in a preallocated array.
+              A chosen cell is swapped past the end of the live
+              part instead of being removed, so undoing the whole
+              playout is just restoring the count (the array is
+              only refilled when the board changes). *
+        """
+
+        free = self._free
+        if self._free_of != state:
+            self._free_n = self._fill_free(state)
+            self._free_of = state
+        n = self._free_n
+
+        mine, theirs = self.masks(state, player)
+        rand = rng.random
+        wins = self._wins_at
+        width = self.width
+        mover_wins = 1
+        while True:
+
+            # make a random move (swap-remove it from the empty cells)
+            j = int(rand() * n)
+            n -= 1
+            cell = free[j]
+            free[j] = free[n]
+            free[n] = cell
+            mine |= 1 << cell
+            if played is not None:
+                played.append((cell % width, cell // width))
+
+            # only stop if game ends
+            if wins(mine, cell):
+                return mover_wins
+            if n == 0:
+                return 3
+
+            # move to next player
+            mine, theirs = theirs, mine
+            mover_wins = 3 - mover_wins
+
+    def fork(self):
+        """ Game protocol: returns a copy of the game with its
+            own playout scratch, so threads don't share it.
+        """
+
+        game = Game.fork(self)
+        game._free = [0] * len(self._free)
+        game._free_of = None
+        return game
+
+    def _fill_free(self, state):
+        """ Writes the empty cell indexes of 'state' into the
+            playout scratch array and returns how many there are.
+        """
+
+        free = self._free
+        taken = (state | state >> Bitboard.CELLS) & Bitboard.FULL
+        n = 0
+        for i in range(Bitboard.CELLS):
+            if not taken >> i & 1:
+                free[n] = i
+                n += 1
+        return n
+
+    def masks(self, state, player):
+        """ Returns the cells of 'player' and of its opponent.
+        """
+
+        return (
+            Bitboard.mask_of(state, player.symbol),
+            Bitboard.mask_of(state, player.opponent.symbol)
+        )
+
+    def _wins_at(self, mask, cell):
+        """ True if 'mask' has a win (it just took 'cell').
+        """
+
+        return Bitboard.wins(mask)
+
+    def rollouts(self, player, board, n, rng=None):
+        """ Plays 'n' random games at once from 'board' with
+            'player' to move. Returns the outcome counts for
+            'player' as a list: [-, wins, losses, draws]
+
+            * The NumPy stream is seeded from 'rng' (the game's
+              own if None), so results are reproducible. *
+            * Returns None if NumPy is not available. *
+        """
+
+        if not BatchRollout.available:
+            return None
+
+        if rng is None:
+            rng = self.rng
+
+        return BatchRollout.rollout(
+            Bitboard.mask_of(board, player.symbol),
+            Bitboard.mask_of(board, player.opponent.symbol),
+            n,
+            seed = rng.getrandbits(64)
+        )
 
     def cheap_copy(self):
         """ Returns a copy of the game board.
+            (Boards are ints, so this is just the value.)
         """
 
-        return copy(self.board)
+        return self.board
 
     def render(self):
         """ Prints the board using text.
         """
 
-        b = self.board
+        b = [[self.at([x, y]) for x in range(3)] for y in range(3)]
 
         s = '\n'
         s += '\t {} | {} | {} \n'.format(b[0][0], b[0][1], b[0][2])
@@ -225,11 +403,16 @@ class TicTacToe:
 
         print(s)
 
-    def start(self, debug=False, detail=False):
+    def start(self, debug=False, detail=False, quiet=False, on_move=None):
         """ Begins and manages the game.
+
+            * 'quiet' plays the game without printing or rendering. *
+            * 'on_move' is called as on_move(player, move) after
+              every move is placed. *
         """
 
-        print("Game has started...\n")
+        if not quiet:
+            print("Game has started...\n")
 
         self.summary = 'Game started.'
         complete = False
@@ -245,18 +428,22 @@ class TicTacToe:
 
             # if 1st turn, set symbols (affects both players)
             if (self.turns == 1):
-                current.choose_symbol()
+                current.choose_symbol(quiet)
 
             # render board
-            self.render()
-            print("Player " + str(current.play_index) + "'s turn (" + current.symbol + "):")
+            if not quiet:
+                self.render()
+                print("Player " + str(current.play_index) + "'s turn (" + current.symbol + "):")
             
             # current player picks move (bad moves handled inside 'go')
             move = current.go(self, debug, detail)
             if move is None:
-                print("MCTS ran out of time and was not able to find any moves... turn skipped!")
+                if not quiet:
+                    print("MCTS ran out of time and was not able to find any moves... turn skipped!")
                 continue
-            self.board[move[1]][move[0]] = current.symbol
+            self.set_at(move, current.symbol)
+            if on_move is not None:
+                on_move(current, move)
 
             # check & handle events
             # 0 : nothing
@@ -267,13 +454,16 @@ class TicTacToe:
             if state is not 0:
                 complete = True
                 if state is 1:
+                    self.winner = current
                     self.summary = "Game over. Player " + str(current.play_index) + " (" + current.symbol + ") wins!"
                 elif state is 2:
-                    self.summary = "Game over. Player " + str(current.opponent.play_index) + " (" + current.symbol + ") wins!"
+                    self.winner = current.opponent
+                    self.summary = "Game over. Player " + str(current.opponent.play_index) + " (" + current.opponent.symbol + ") wins!"
                 elif state is 3:
                     self.summary = "Game over. It is a draw."
         
-        self.render() # final render
+        if not quiet:
+            self.render() # final render
 
         
 
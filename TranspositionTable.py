@@ -0,0 +1,100 @@
+# -------------------------------------------------- #
+# Filename:     TranspositionTable.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Transposition table used to share
+#               Monte Carlo nodes across move orders.
+# -------------------------------------------------- #
+
+# imports
+from collections import OrderedDict
+
+# class
+class TranspositionTable:
+    """ Transposition Table!
+
+        This class does the following:
+        - maps a board hash to the node storing its statistics
+        - evicts the least recently used entry when full,
+          giving a second chance to nodes visited since they
+          were last looked at
+
+        * keys are the game's 'hash' of a board (or its
+          'canonical' form, see Game): bitboard ints, so they
+          are perfect hashes. Games whose boards also record
+          the last move (MNKGame, ConnectFour) mask it off *
+        * an evicted node is cut out of the tree with its
+          whole subtree (see MonteCarloNode.prune / unlink):
+          its parent may try its move again later, and
+          whatever only it led to can be freed, so the
+          capacity bounds the tree as well as the table *
+        * roots (nodes without a parent) and nodes a search is
+          passing through (virtual losses) are never evicted *
+    """
+
+    def __init__(self, capacity=None):
+        """ Initializes the table.
+            A capacity of None means unbounded.
+        """
+
+        self.capacity = capacity
+        self.entries = OrderedDict() # hash -> [node, its visits when last looked at] (oldest first)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """ Number of stored positions.
+        """
+
+        return len(self.entries)
+
+    def __contains__(self, key):
+        """ True if the position is stored.
+        """
+
+        return key in self.entries
+
+    def get(self, key):
+        """ Returns the node stored for a position (and marks
+            it as recently used), or None.
+        """
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, node):
+        """ Stores a node for a position, evicting (and
+            pruning) the least recently used entries if over
+            capacity.
+        """
+
+        self.entries[key] = [node, node.sims]
+        self.entries.move_to_end(key)
+
+        if self.capacity is not None:
+            entries = self.entries
+            while len(entries) > self.capacity:
+                old_key, entry = entries.popitem(last=False)
+                old = entry[0]
+                if old.p is None or old.vl or old.sims != entry[1]:
+                    # second chance
+                    entry[1] = old.sims
+                    entries[old_key] = entry
+                    continue
+                old.prune()
+                if old.sims <= 1:
+                    old.p.unlink(old)
+                self.evictions += 1
+
+    def clear(self):
+        """ Removes every entry.
+        """
+
+        self.entries.clear()
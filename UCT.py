@@ -0,0 +1,156 @@
+# -------------------------------------------------- #
+# Filename:     UCT.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Fast child selection (UCT / PUCT) with
+#               precomputed lookup tables.
+# -------------------------------------------------- #
+
+# imports
+import math
+try:
+    import numpy as np
+except ImportError: # optional dependency
+    np = None
+
+# constants
+available = np is not None # vectorized selection needs NumPy
+TABLE_SIZE = 8192 # visit counts covered by the lookup tables
+VECTOR_MIN = 32   # fewest children worth a vectorized selection
+
+# lookup tables, indexed by visit count
+SQRT_LN = [0.0] + [math.sqrt(math.log(n)) for n in range(1, TABLE_SIZE)] # sqrt(ln n)
+RECIP   = [0.0] + [1 / n for n in range(1, TABLE_SIZE)]                  # 1 / n
+RSQRT   = [0.0] + [1 / math.sqrt(n) for n in range(1, TABLE_SIZE)]       # 1 / sqrt(n)
+
+# functions
+def sqrt_ln(n):
+    """ Returns sqrt(ln n) (0 for n < 2).
+    """
+
+    if n < TABLE_SIZE:
+        return SQRT_LN[n]
+    return math.sqrt(math.log(n))
+
+def best(children, parent_sims, C):
+    """ Returns the maximum-UCT scoring node of 'children'
+        (None if there are none), given the parent's visits.
+
+        * The parent's log term is computed once; per child,
+          1/s and 1/sqrt(s) come from the lookup tables. *
+        * The first unvisited child wins straight away. *
+        * Virtual losses count as visits that scored nothing. *
+        * Proven children are never picked. *
+    """
+
+    explore = C * sqrt_ln(parent_sims)
+    recip = RECIP
+    rsqrt = RSQRT
+
+    best_pts = -math.inf
+    best_child = None
+    for child in children:
+        if child.proven:
+            continue
+        s = child.sims + child.vl
+        if s == 0:
+            return child
+        if s < TABLE_SIZE:
+            pts = child.wins * recip[s] + explore * rsqrt[s]
+        else:
+            pts = child.wins / s + explore / math.sqrt(s)
+        if best_pts < pts:
+            best_pts = pts
+            best_child = child
+
+    return best_child
+
+def best_puct(children, priors, parent_sims, C, unvisited):
+    """ Returns the maximum-PUCT scoring node of 'children'
+        (None if there are none), where priors[i] is the
+        prior of children[i].
+
+        * Unvisited children are valued as 'unvisited'. *
+        * Proven children are never picked. *
+    """
+
+    explore = C * math.sqrt(parent_sims)
+    recip = RECIP
+
+    best_pts = -math.inf
+    best_child = None
+    for child, prior in zip(children, priors):
+        if child.proven:
+            continue
+        s = child.sims + child.vl
+        if s == 0:
+            q = unvisited
+        elif s < TABLE_SIZE:
+            q = child.wins * recip[s]
+        else:
+            q = child.wins / s
+        pts = q + explore * prior / (1 + s)
+        if best_pts < pts:
+            best_pts = pts
+            best_child = child
+
+    return best_child
+
+def best_rave(children, moves, amaf, parent_sims, C, k):
+    """ Returns the maximum-RAVE scoring node of 'children'
+        (None if there are none), where moves[i] leads to
+        children[i] and 'amaf' maps a move (tuple) to its
+        all-moves-as-first [wins, visits].
+
+        * A child's mean is blended with its move's AMAF mean,
+          the AMAF share being sqrt(k / (3 s + k)) for s visits:
+          'k' (the equivalence parameter) is how many visits it
+          takes for the child's own mean to count as much. *
+        * The first unvisited child wins straight away. *
+        * Proven children are never picked. *
+    """
+
+    explore = C * sqrt_ln(parent_sims)
+    rsqrt = RSQRT
+
+    best_pts = -math.inf
+    best_child = None
+    for child, move in zip(children, moves):
+        if child.proven:
+            continue
+        s = child.sims + child.vl
+        if s == 0:
+            return child
+        q = child.wins / s
+        stats = amaf.get(tuple(move))
+        if stats is not None:
+            q += math.sqrt(k / (3 * s + k)) * (stats[0] / stats[1] - q)
+        pts = q + explore * (rsqrt[s] if s < TABLE_SIZE else 1 / math.sqrt(s))
+        if best_pts < pts:
+            best_pts = pts
+            best_child = child
+
+    return best_child
+
+def best_index(wins, sims, parent_sims, C, proven=None):
+    """ Vectorized UCT: returns the index of the best entry
+        of the parallel arrays 'wins' and 'sims' (anything
+        NumPy can read, e.g. slices of a NodeStore's arrays).
+
+        * The first unvisited entry wins straight away. *
+        * Entries that are non-zero in 'proven' are never
+          picked (None if that is all of them). *
+        * Needs NumPy. *
+    """
+
+    sims = np.asarray(sims)
+    live = sims >= 0 if proven is None else np.asarray(proven) == 0
+    unvisited = np.flatnonzero((sims == 0) & live)
+    if unvisited.size:
+        return int(unvisited[0])
+    if not live.any():
+        return None
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pts = np.asarray(wins) / sims + (C * sqrt_ln(parent_sims)) / np.sqrt(sims)
+    return int(np.argmax(np.where(live, pts, -np.inf)))
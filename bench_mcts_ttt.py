@@ -0,0 +1,254 @@
+# -------------------------------------------------- #
+# Filename:     bench_mcts_ttt.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Non-interactive benchmarks for MCTS
+#               throughput and playing strength.
+# -------------------------------------------------- #
+
+# imports
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import BatchRollout
+from MCTSPlayer import MCTSPlayer, SQRT2
+from MinimaxPlayer import MinimaxPlayer
+from MonteCarloNode import MonteCarloNode
+from MonteCarloTree import MonteCarloTree
+from TicTacToe import TicTacToe
+
+# constants
+HIGHER = 'higher' # bigger numbers are better
+LOWER  = 'lower'  # smaller numbers are better
+
+# macros
+clock = time.perf_counter
+
+# helpers
+def new_game(seed):
+    """ Returns an empty TicTacToe game (X to move) and its players.
+    """
+
+    p1 = MCTSPlayer(seed=seed, verbose=False)
+    p2 = MCTSPlayer(seed=seed, verbose=False)
+    game = TicTacToe(p1, p2, seed=seed)
+    p1.symbol = 'X'
+    p2.symbol = 'O'
+    game.go_first = 1
+    game.turns = 1
+    return game, p1, p2
+
+def count_nodes(tree):
+    """ Number of distinct nodes in a tree.
+    """
+
+    if hasattr(tree.root, 's'):
+        return len(tree.root.s)
+
+    seen = set()
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen.add(id(node))
+            stack.extend(node.c)
+    return len(seen)
+
+def metric(value, unit, better):
+    """ Packs a single benchmark result.
+    """
+
+    return {'value': value, 'unit': unit, 'better': better}
+
+# benchmarks
+def bench_simulate(playouts, seed):
+    """ Random playouts per second (one at a time).
+    """
+
+    game, p1, p2 = new_game(seed)
+    leaf = MonteCarloNode(p2, game.board)
+    rng = game.rng
+
+    start = clock()
+    for _ in range(playouts):
+        MonteCarloTree._simulate(game, leaf, rng)
+    return playouts / (clock() - start)
+
+def bench_simulate_memory(playouts, seed):
+    """ Peak traced bytes while running random playouts
+        (allocation churn of the playout path).
+    """
+
+    game, p1, p2 = new_game(seed)
+    leaf = MonteCarloNode(p2, game.board)
+    rng = game.rng
+
+    tracemalloc.start()
+    for _ in range(playouts):
+        MonteCarloTree._simulate(game, leaf, rng)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def bench_simulate_batch(playouts, seed):
+    """ Random playouts per second (vectorized batch).
+    """
+
+    game, p1, p2 = new_game(seed)
+    start = clock()
+    game.rollouts(p1, game.board, playouts)
+    return playouts / (clock() - start)
+
+def bench_select(iterations, seed):
+    """ Full mcts iterations per second.
+    """
+
+    game, p1, p2 = new_game(seed)
+    start = clock()
+    MonteCarloTree.search(game, None, SQRT2, iterations=iterations, seed=seed, verbose=False)
+    return iterations / (clock() - start)
+
+def bench_expand(expansions, seed):
+    """ Nodes created per second by expansion.
+    """
+
+    game, p1, p2 = new_game(seed)
+    created = 0
+
+    start = clock()
+    for _ in range(expansions):
+        leaf = MonteCarloNode(p2, game.board)
+        MonteCarloTree._expand(game, leaf)
+        created += leaf.amount()
+    return created / (clock() - start)
+
+def bench_memory(iterations, seed, compact):
+    """ Peak traced bytes per node of a searched tree.
+    """
+
+    game, p1, p2 = new_game(seed)
+    tracemalloc.start()
+    tree = MonteCarloTree.search(game, None, SQRT2, iterations=iterations, seed=seed, verbose=False, compact=compact)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / count_nodes(tree)
+
+def bench_strength(games, iterations, seed):
+    """ Win / draw / loss rates of MCTSPlayer against a
+        perfect minimax opponent (sides alternate).
+    """
+
+    results = {'win': 0, 'draw': 0, 'loss': 0}
+    for i in range(games):
+        mcts = MCTSPlayer(time_limit=None, iterations=iterations, seed=seed + i, verbose=False)
+        perfect = MinimaxPlayer(seed=seed + i)
+        players = (mcts, perfect) if i % 2 == 0 else (perfect, mcts)
+        game = TicTacToe(players[0], players[1], seed=seed + i)
+        game.start(quiet=True)
+        if game.winner is None:
+            results['draw'] += 1
+        elif game.winner is mcts:
+            results['win'] += 1
+        else:
+            results['loss'] += 1
+
+    return {k: v / games for k, v in results.items()}
+
+def run(args):
+    """ Runs every benchmark and returns the results.
+    """
+
+    metrics = {}
+
+    def report(name, result):
+        metrics[name] = result
+        print('{:<36} {:>14.2f} {}'.format(name, result['value'], result['unit']))
+
+    report('simulate_playouts_per_sec', metric(bench_simulate(args.playouts, args.seed), 'playouts/s', HIGHER))
+    report('simulate_peak_bytes', metric(bench_simulate_memory(args.playouts, args.seed), 'bytes', LOWER))
+    if BatchRollout.available:
+        report('batch_playouts_per_sec', metric(bench_simulate_batch(args.playouts * 10, args.seed), 'playouts/s', HIGHER))
+    report('select_iterations_per_sec', metric(bench_select(args.iterations, args.seed), 'iterations/s', HIGHER))
+    report('expand_nodes_per_sec', metric(bench_expand(args.playouts, args.seed), 'nodes/s', HIGHER))
+    report('bytes_per_node', metric(bench_memory(args.iterations, args.seed, False), 'bytes', LOWER))
+    report('bytes_per_node_compact', metric(bench_memory(args.iterations, args.seed, True), 'bytes', LOWER))
+    for budget in args.budgets:
+        rates = bench_strength(args.games, budget, args.seed)
+        report('vs_minimax_{}_loss_rate'.format(budget), metric(rates['loss'], 'rate', LOWER))
+        report('vs_minimax_{}_draw_rate'.format(budget), metric(rates['draw'], 'rate', HIGHER))
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'numpy': BatchRollout.available,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'args': vars(args)
+        },
+        'metrics': metrics
+    }
+
+def regressions(results, baseline, threshold):
+    """ Returns a list of descriptions of every metric that
+        got worse than the baseline by more than 'threshold'
+        (relative change, or absolute change for rates).
+    """
+
+    found = []
+    for name, new in results['metrics'].items():
+        old = baseline.get('metrics', {}).get(name)
+        if old is None:
+            continue
+
+        if new['unit'] == 'rate':
+            change = new['value'] - old['value']
+        elif old['value']:
+            change = (new['value'] - old['value']) / old['value']
+        else:
+            continue
+        if new['better'] == HIGHER:
+            change = -change
+
+        if change > threshold:
+            found.append('{}: {:.2f} -> {:.2f} {}'.format(name, old['value'], new['value'], new['unit']))
+
+    return found
+
+# benchmark harness
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Benchmark MCTS throughput and playing strength.')
+    parser.add_argument('--out', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed regression (0.10 = 10%%)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--playouts', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--budgets', type=int, nargs='+', default=[100, 1000])
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print('Results written to ' + args.out)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.threshold)
+        if found:
+            print('Regressions found:')
+            for line in found:
+                print('    ' + line)
+            return 1
+        print('No regressions.')
+
+    return 0
+
+# if this is file running, run the following
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,459 @@
+# -------------------------------------------------- #
+# Filename:     test_regressions.py
+# Author:       Ibrahim Sardar
+# Created:      10/18/2026
+# Desc:         Non-interactive regression checks (run
+#               with pytest, or as a script).
+# -------------------------------------------------- #
+
+# imports
+import os
+import sys
+import time
+import pickle
+import random
+import asyncio
+import tempfile
+import Bitboard
+import Solver
+from Evaluator import RolloutEvaluator
+from MCTSPlayer import MCTSPlayer, MERGE_VISITS, MERGE_VOTE, _search_worker
+from MNKGame import MNKGame
+from MonteCarloTree import MonteCarloTree, OUTCOME_NONE, OUTCOME_WIN, OUTCOME_LOSE, OUTCOME_DRAW
+from MoveService import MoveService
+from PositionCache import PositionCache
+from Seeding import make_rng, derive
+from TicTacToe import TicTacToe
+from TranspositionTable import TranspositionTable
+
+# constants
+# Solver value for the player to move -> proven outcome of the root (for the player who just moved)
+PROVEN = {1: OUTCOME_LOSE, 0: OUTCOME_DRAW, -1: OUTCOME_WIN}
+LINES = (
+    [(0, 0), (1, 0), (2, 0)], [(0, 1), (1, 1), (2, 1)], [(0, 2), (1, 2), (2, 2)],
+    [(0, 0), (0, 1), (0, 2)], [(1, 0), (1, 1), (1, 2)], [(2, 0), (2, 1), (2, 2)],
+    [(0, 0), (1, 1), (2, 2)], [(2, 0), (1, 1), (0, 2)]
+)
+
+# helpers
+def new_game(game_class=TicTacToe, *args, seed=0):
+    """ Returns an empty game (X to move) between two quiet
+        mcts players.
+    """
+
+    p1 = MCTSPlayer(seed=seed, verbose=False)
+    p2 = MCTSPlayer(seed=seed, verbose=False)
+    game = game_class(p1, p2, *args, seed=seed)
+    p1.symbol = 'X'
+    p2.symbol = 'O'
+    game.go_first = 1
+    return game
+
+def positions(game):
+    """ Every position reachable from the empty board (each
+        once), final ones included.
+    """
+
+    seen = {0}
+    queue = [0]
+    for state in queue:
+        if game.result(state, game.to_move(state)) != OUTCOME_NONE:
+            continue
+        for mv in game.legal_moves(state):
+            child = game.apply(state, mv)
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return queue
+
+def count_nodes(root):
+    """ Number of distinct nodes under a node tree's root.
+    """
+
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen.add(id(node))
+            stack.extend(node.c)
+    return len(seen)
+
+# bitboards
+def test_bitboard_rules_match_a_plain_grid():
+    """ Wins and draws of every reachable 3x3 position match
+        a naive check over a grid of symbols.
+    """
+
+    game = new_game()
+    states = positions(game)
+    assert len(states) == 5478
+
+    for state in states:
+        grid = {(x, y): Bitboard.symbol_at(state, [x, y]) for x in range(3) for y in range(3)}
+        winner = None
+        for line in LINES:
+            symbols = {grid[pt] for pt in line}
+            if len(symbols) == 1 and '_' not in symbols:
+                winner = symbols.pop()
+        player = game.to_move(state)
+        if winner is not None:
+            expected = OUTCOME_WIN if winner == player.symbol else OUTCOME_LOSE
+        elif '_' not in grid.values():
+            expected = OUTCOME_DRAW
+        else:
+            expected = OUTCOME_NONE
+        assert game.result(state, player) == expected, state
+
+def test_step_matches_apply_and_result():
+    """ Game.step gives the same board, outcome and legal
+        moves as apply, result and legal_moves.
+    """
+
+    for game in (new_game(), new_game(MNKGame, 4, 4, 3)):
+        rng = random.Random(1)
+        for _ in range(200):
+            state = 0
+            while game.result(state, game.to_move(state)) == OUTCOME_NONE:
+                legal = game.legal_moves(state)
+                mv = rng.choice(legal)
+                after, result, moves = game.step(state, mv, legal)
+                assert after == game.apply(state, mv)
+                assert result == game.result(after, game.to_move(after))
+                if result == OUTCOME_NONE:
+                    assert sorted(map(tuple, moves)) == sorted(map(tuple, game.legal_moves(after)))
+                state = after
+
+# MCTS-Solver
+def test_proven_roots_match_the_solver():
+    """ Searches of random 3x3 positions only ever prove the
+        solver's value, and always pick a perfect move.
+    """
+
+    game = new_game()
+    rng = random.Random(3)
+    proven = 0
+    for trial in range(40):
+        state = 0
+        for _ in range(rng.randrange(6)):
+            state = game.apply(state, rng.choice(game.legal_moves(state)))
+            if game.result(state, game.to_move(state)) != OUTCOME_NONE:
+                break
+        mover = game.to_move(state)
+        if game.result(state, mover) != OUTCOME_NONE:
+            continue
+
+        game.board = state
+        for options in ({}, {'table': TranspositionTable()}, {'compact': True}):
+            tree = MonteCarloTree.search(game, None, 1.4, iterations=5000, verbose=False, seed=trial, **options)
+            best, value = Solver.best_cells(*game.masks(state, mover))
+            assert tree.root.proven in (OUTCOME_NONE, PROVEN[value]), (state, options)
+            assert Bitboard.index(tree.best_move(False)) in best, (state, options)
+            proven += tree.root.proven != OUTCOME_NONE
+
+    assert proven > 0
+
+# saved trees
+def test_save_and_load_round_trip():
+    """ A saved tree loads (copied or memory-mapped) with every
+        node and the same root statistics.
+    """
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'tree.bin')
+        for game, options in ((new_game(), {}), (new_game(), {'compact': True}),
+                              (new_game(MNKGame, 5, 5, 4), {}), (new_game(), {'table': TranspositionTable()})):
+            tree = MonteCarloTree.search(game, None, 1.4, iterations=1000, verbose=False, seed=1, **options)
+            tree.save(path)
+            nodes = len(tree.root.s) if options.get('compact') else count_nodes(tree.root)
+
+            for mapped in (False, True):
+                loaded = MonteCarloTree.load(path, game, mapped)
+                assert len(loaded.root.s) == nodes
+                assert loaded.root_stats() == tree.root_stats()
+                assert loaded.best_move(False) == tree.best_move(False)
+                del loaded
+
+def test_loaded_trees_expand_their_missing_moves():
+    """ Partially expanded nodes keep their children through a
+        save, and searching the loaded tree expands the rest of
+        their moves.
+    """
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'tree.bin')
+        for options in ({}, {'table': TranspositionTable()}):
+            game = new_game()
+            tree = MonteCarloTree.search(game, None, 1.4, iterations=5, verbose=False, seed=1, **options)
+            tree.save(path)
+
+            loaded = MonteCarloTree.load(path, game)
+            assert loaded.root.partial
+            assert loaded.root.amount() == tree.root.amount() < 9
+            loaded = MonteCarloTree.search(game, None, 1.4, iterations=500, verbose=False, seed=2, tree=loaded)
+            assert loaded.root.sims == tree.root.sims + 500
+            assert loaded.root.amount() == 9 and not loaded.root.partial
+
+# transpositions
+def test_mnk_move_orders_share_a_key():
+    """ The same stones reached by different move orders are
+        one position.
+    """
+
+    game = new_game(MNKGame, 5, 5, 4)
+    a = game.apply(game.apply(game.apply(0, [0, 0]), [1, 1]), [2, 2])
+    b = game.apply(game.apply(game.apply(0, [2, 2]), [1, 1]), [0, 0])
+    assert a != b
+    assert game.hash(a) == game.hash(b)
+
+def test_table_size_bounds_the_tree():
+    """ A bounded transposition table keeps the tree to a
+        small multiple of its capacity.
+    """
+
+    game = new_game(MNKGame, 6, 6, 4)
+    tree = MonteCarloTree.search(game, None, 1.4, iterations=5000, verbose=False, seed=1, table=TranspositionTable(500))
+    assert len(tree.table) <= 500
+    assert count_nodes(tree.root) < 5 * 500
+    assert tree.best_move(False) is not None
+
+def test_bounded_table_with_an_evaluator():
+    """ Batched evaluator searches on a bounded table finish,
+        and get back the moves of children the table took.
+    """
+
+    for game, size in ((new_game(), 50), (new_game(MNKGame, 5, 5, 4), 100)):
+        tree = MonteCarloTree.search(game, None, 1.4, iterations=2000, verbose=False, seed=1,
+                                     evaluator=RolloutEvaluator(4), batch=16, table=TranspositionTable(size))
+        assert len(tree.table) <= size
+        assert sorted(map(tuple, tree.root.moves)) == sorted(map(tuple, game.legal_moves(game.board)))
+        assert tree.best_move(False) is not None
+
+# time limits
+def test_slow_iterations_respect_the_time_limit():
+    """ Searches whose iterations are slow still stop close
+        to their time limit.
+    """
+
+    game = new_game(MNKGame, 15, 15, 5)
+    for options in ({'rollouts': 32}, {'threads': 2, 'rollouts': 32}, {'evaluator': RolloutEvaluator(32), 'batch': 8}):
+        start = time.perf_counter()
+        MonteCarloTree.search(game, 100, 1.4, verbose=False, seed=1, **options)
+        assert time.perf_counter() - start < 0.5, options
+
+# evaluators
+def test_queued_searches_evaluate_every_iteration():
+    """ Every iteration of a batched evaluator search
+        evaluates (or settles) one leaf, even when a leaf is
+        picked again while it waits in the queue.
+    """
+
+    for options in ({}, {'table': TranspositionTable()}, {'table': TranspositionTable(50)}):
+        tree = MonteCarloTree.search(new_game(), None, 1.4, iterations=2000, verbose=False, seed=1,
+                                     evaluator=RolloutEvaluator(4), batch=16, **options)
+        assert tree.root.sims == 2000, options
+
+# move service
+def test_move_service_answers_and_caches():
+    """ The service answers a request, serves the repeat from
+        its cache and rejects bad requests.
+    """
+
+    async def run():
+        service = MoveService(workers=1)
+        try:
+            request = {'board': 0, 'player': 'X', 'iterations': 300, 'time_limit': None, 'seed': 1, 'id': 7}
+            first = await service.move(request)
+            again = await service.move(request)
+            bad = await service.move({'board': 0, 'player': 'Z'})
+        finally:
+            service.close()
+        return first, again, bad
+
+    first, again, bad = asyncio.run(run())
+    assert first['id'] == 7 and not first['cached'] and len(first['move']) == 2
+    assert again['cached'] and again['move'] == first['move']
+    assert 'error' in bad
+
+def test_move_service_rejects_bad_boards():
+    """ Impossible boards and unknown games are turned away
+        in-process, even while every search slot is taken.
+    """
+
+    bad = (
+        {'board': 1, 'player': 'X'},              # X to move again
+        {'board': 1 | 1 << 9, 'player': 'O'},     # X and O on one cell
+        {'board': 1 << 18, 'player': 'X'},        # off the board
+        {'game': 'chess', 'board': 0, 'player': 'X'},
+        {'game': 'connect4', 'board': 1, 'player': 'O'} # floating stone
+    )
+
+    async def run():
+        service = MoveService(workers=1, pending=1)
+        try:
+            busy = asyncio.ensure_future(service.move({'board': 0, 'player': 'X', 'time_limit': 200}))
+            await asyncio.sleep(0)
+            replies = [await service.move(request) for request in bad]
+            await busy
+        finally:
+            service.close()
+        return replies, service.counts
+
+    replies, counts = asyncio.run(run())
+    for request, reply in zip(bad, replies):
+        assert reply['error'].startswith('bad request'), (request, reply)
+    assert counts['searches'] == 1 and counts['busy'] == 0
+
+# position cache
+def test_cache_maps_moves_through_the_symmetry():
+    """ A position found through a symmetric copy gets every
+        stored move's own stats, mapped onto its board (also
+        when the stored position is itself symmetric).
+    """
+
+    game = new_game()
+    cache = PositionCache(min_sims=1)
+    # X in a corner is symmetric about the diagonal: (1,0) and (0,1) are mirror moves
+    cache.put(game, game.apply(0, [0, 0]), {(1, 0): (1, 10), (0, 1): (5, 20), (1, 1): (2, 4)}, [0, 1])
+    board = game.apply(0, [2, 0])
+    stats, best, confident = cache.get(game, board)
+    assert sorted(stats.values()) == [(1, 10), (2, 4), (5, 20)]
+    assert set(stats) <= set(map(tuple, game.legal_moves(board)))
+    assert stats[(1, 1)] == (2, 4) and stats[tuple(best)] == (5, 20) and confident
+
+    game = new_game(MNKGame, 5, 4, 3)
+    board = game.apply(game.apply(0, [0, 0]), [1, 2])
+    cache.put(game, board, {(4, 3): (3, 7), (2, 2): (1, 2)}, [4, 3])
+    stats, best, _ = cache.get(game, game.apply(game.apply(0, [4, 3]), [3, 1]))
+    assert stats == {(0, 0): (3, 7), (2, 1): (1, 2)}
+    assert best == [0, 0]
+    assert cache.get(game, game.apply(board, [2, 2])) is None
+
+# tree reuse
+def test_reused_tree_keeps_the_reply_subtree():
+    """ A player's next search continues from the node of
+        the board it now faces, and pickling the player leaves
+        the tree behind.
+    """
+
+    game = new_game()
+    player = game.p1
+    player.iterations = 500
+    player.time_limit = None
+
+    move = player.go(game)
+    game.board = game.apply(game.board, move)
+    reply = game.legal_moves(game.board)[0]
+    root = player.tree.root
+    child = next(c for c, mv in zip(root.c, root.cm) if list(mv) == list(move))
+    kept = next(c for c, mv in zip(child.c, child.cm) if list(mv) == list(reply))
+    sims = kept.sims
+    game.board = game.apply(game.board, reply)
+
+    player.go(game)
+    assert player.tree.root is kept
+    assert kept.sims == sims + 500 and kept.p is None
+    assert pickle.loads(pickle.dumps(player)).tree is None
+
+# opening book
+def test_book_moves_are_perfect():
+    """ Every unfinished 3x3 position is in the book (also
+        after a save and load), with one of the solver's best
+        moves, and a player with the book answers from it.
+    """
+
+    game = new_game()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'tictactoe.book')
+        Solver.build_book().save(path)
+        book = Solver.load_book(path)
+
+    for state in positions(game):
+        player = game.to_move(state)
+        if game.result(state, player) != OUTCOME_NONE:
+            continue
+        mine, theirs = game.masks(state, player)
+        assert Bitboard.index(book.lookup(mine, theirs)) in Solver.best_cells(mine, theirs)[0], state
+
+    game.p1.book = book
+    game.board = game.apply(game.apply(0, [0, 0]), [1, 1])
+    move = game.p1.go(game)
+    assert move == book.lookup(*game.masks(game.board, game.p1)) and game.p1.last_stats is None
+
+# root-parallel search
+def test_root_parallel_merge():
+    """ Root-parallel players sum their workers' root
+        statistics, then pick the most visited move, or the
+        one most workers voted for.
+    """
+
+    for merge in (MERGE_VISITS, MERGE_VOTE):
+        game = new_game()
+        player = game.p1
+        player.workers = 3
+        player.iterations = 300
+        player.time_limit = None
+        player.merge = merge
+        player.rng = make_rng(5)
+        try:
+            move = tuple(player.go(game))
+        finally:
+            player.close()
+
+        results = [_search_worker(game, None, player.uct_c, 300, seed) for seed in derive(make_rng(5), 3)]
+        merged = {}
+        for stats, _ in results:
+            for mv, (wins, sims) in stats.items():
+                w, s = merged.get(mv, (0, 0))
+                merged[mv] = (w + wins, s + sims)
+        assert player.last_stats == merged
+
+        if merge == MERGE_VISITS:
+            assert merged[move][1] == max(s for _, s in merged.values())
+        else:
+            votes = [tuple(best) for _, best in results]
+            assert votes.count(move) == max(votes.count(mv) for mv in votes)
+
+# RAVE
+def test_rave_picks_perfect_moves():
+    """ RAVE searches of random 3x3 positions pick one of
+        the solver's best moves, and a root's AMAF counts cover
+        every visit of its children.
+    """
+
+    game = new_game()
+    rng = random.Random(3)
+    for trial in range(40):
+        state = 0
+        for _ in range(rng.randrange(6)):
+            state = game.apply(state, rng.choice(game.legal_moves(state)))
+            if game.result(state, game.to_move(state)) != OUTCOME_NONE:
+                break
+        mover = game.to_move(state)
+        if game.result(state, mover) != OUTCOME_NONE:
+            continue
+
+        game.board = state
+        tree = MonteCarloTree.search(game, None, 1.4, iterations=1000, verbose=False, seed=trial, rave=300)
+        assert Bitboard.index(tree.best_move(False)) in Solver.best_cells(*game.masks(state, mover))[0], state
+        root = tree.root
+        for child, mv in zip(root.c, root.cm):
+            assert child.sims <= root.amaf[tuple(mv)][1] <= root.sims
+
+# run every check from the command line
+def main():
+
+    failed = 0
+    for name, check in sorted(globals().items()):
+        if name.startswith('test_') and callable(check):
+            try:
+                check()
+                print('ok      ' + name)
+            except AssertionError as e:
+                failed += 1
+                print('FAILED  ' + name + ' ' + str(e))
+    return 1 if failed else 0
+
+# if this is file running, run the following
+if __name__ == "__main__":
+    sys.exit(main())